@@ -0,0 +1,469 @@
+# === arcpy stand-in ===
+# Minimal in-memory replacement for the parts of arcpy used by the profile tool.
+# Install() registers it as the arcpy module so PLAN_AND_PROFILE.py and
+# profile_generator.py run unchanged without ArcGIS Pro. Every geometry
+# construction, cursor open, row operation and edit session save is tallied in COUNTS.
+
+import collections
+import json
+import os
+import sys
+
+COUNTS = collections.Counter()
+MESSAGES = []
+WORKSPACE = {}     # Feature class path -> FeatureClass
+PARAMETERS = []    # Values returned by GetParameterAsText
+
+
+def Install():
+    """Register this module as arcpy (returns the module)"""
+    module = sys.modules[__name__]
+    sys.modules["arcpy"] = module
+    return module
+
+
+def Reset(parameters=()):
+    """Clear the workspace (except the scratch geodatabase), counters and messages and set the tool parameter values"""
+    COUNTS.clear()
+    MESSAGES.clear()
+    scratch = os.path.join(env.scratchGDB, "")
+    for path in [path for path in WORKSPACE if not path.startswith(scratch)]:
+        del WORKSPACE[path]
+    PARAMETERS[:] = [str(value) for value in parameters]
+    global PROJECT
+    PROJECT = None
+
+
+# === Messages and parameters ===
+def GetParameterAsText(index):
+    return PARAMETERS[index] if index < len(PARAMETERS) else ""
+
+
+def SetParameter(index, value):
+    COUNTS["SetParameter"] += 1
+
+
+def AddMessage(message):
+    MESSAGES.append(("MESSAGE", message))
+
+
+def AddWarning(message):
+    MESSAGES.append(("WARNING", message))
+
+
+def AddError(message):
+    MESSAGES.append(("ERROR", message))
+
+
+class env:
+    overwriteOutput = False
+    workspace = ""
+    scratchGDB = "scratch.gdb"
+
+
+class ExecuteError(Exception):
+    pass
+
+
+# === Geometry ===
+class SpatialReference:
+    def __init__(self, item=3857):
+        self.factoryCode = item if isinstance(item, int) else 0
+        self.name = f"WKID {item}"
+
+    def exportToString(self):
+        return f"{self.factoryCode};{self.name}"
+
+    def loadFromString(self, text):
+        factory_code, self.name = text.split(";", 1)
+        self.factoryCode = int(factory_code)
+
+
+class Point:
+    __slots__ = ("X", "Y")
+
+    def __init__(self, X=0.0, Y=0.0):
+        COUNTS["Point"] += 1
+        self.X = X
+        self.Y = Y
+
+
+class Array(list):
+    def __init__(self, items=()):
+        COUNTS["Array"] += 1
+        super().__init__(items)
+
+
+class _Geometry:
+    def __init__(self, inputs, spatial_reference=None):
+        COUNTS[type(self).__name__] += 1
+        inputs = list(inputs)
+        if inputs and isinstance(inputs[0], Array):
+            self.parts = [[(point.X, point.Y) for point in part] for part in inputs]
+        else:
+            self.parts = [[(point.X, point.Y) for point in inputs]]
+        self.points = [point for part in self.parts for point in part]
+        self.partCount = len(self.parts)
+        self.spatialReference = spatial_reference
+
+    @property
+    def firstPoint(self):
+        return Point(*self.points[0])
+
+    @property
+    def lastPoint(self):
+        return Point(*self.points[-1])
+
+
+class Polyline(_Geometry):
+    pass
+
+
+class Polygon(_Geometry):
+    pass
+
+
+class PointGeometry(_Geometry):
+    def __init__(self, point, spatial_reference=None):
+        super().__init__([point], spatial_reference)
+
+
+# === Data ===
+class Field:
+    def __init__(self, name, type="String", length=None):
+        self.name = name
+        self.type = type
+        self.length = length
+
+
+class FeatureClass:
+    """In-memory feature class: geometry type, fields and a list of row dictionaries"""
+
+    def __init__(self, geometry_type, spatial_reference=None):
+        self.shapeType = geometry_type
+        self.spatialReference = spatial_reference
+        self.fields = [Field("OBJECTID", "OID"), Field("Shape", "Geometry")]
+        self.rows = []
+        self.next_oid = 1
+
+    def Insert(self, values):
+        values["OID@"] = self.next_oid
+        self.next_oid += 1
+        self.rows.append(values)
+        return values["OID@"]
+
+
+def AddPoints(path, points, spatial_reference=None, fields=None):
+    """Create a point feature class holding (x, y) or (x, y, {field: value}) points"""
+    table = WORKSPACE[path] = FeatureClass("Point", spatial_reference or SpatialReference())
+    for name in fields or ():
+        table.fields.append(Field(name))
+    for point in points:
+        values = {"SHAPE@XY": (point[0], point[1])}
+        values.update(point[2] if len(point) > 2 else {})
+        table.Insert(values)
+    return table
+
+
+class _Describe:
+    def __init__(self, table, path):
+        self.catalogPath = path
+        self.shapeType = table.shapeType
+        self.spatialReference = table.spatialReference
+        self.fields = list(table.fields)
+        self.isVersioned = False
+
+
+def Describe(path):
+    COUNTS["Describe"] += 1
+    return _Describe(_Table(path), path)
+
+
+def ListFields(path):
+    COUNTS["ListFields"] += 1
+    return list(_Table(path).fields)
+
+
+def Exists(path):
+    return path in WORKSPACE
+
+
+def _Table(path):
+    if path not in WORKSPACE:
+        raise ExecuteError(f"ERROR 000732: Dataset {path} does not exist or is not supported")
+    return WORKSPACE[path]
+
+
+class _Result:
+    def __init__(self, *outputs):
+        self.outputs = outputs
+
+    def getOutput(self, index):
+        return self.outputs[index]
+
+
+def CreateFileGDB_management(out_folder_path, out_name, **kwargs):
+    COUNTS["CreateFileGDB"] += 1
+    name = out_name if out_name.endswith(".gdb") else f"{out_name}.gdb"
+    return _Result(os.path.join(out_folder_path, name))
+
+
+def CreateFeatureclass_management(out_path, out_name, geometry_type="POLYGON", template=None,
+                                  has_m=None, has_z=None, spatial_reference=None, **kwargs):
+    COUNTS["CreateFeatureclass"] += 1
+    path = os.path.join(out_path, out_name)
+    if path in WORKSPACE and not env.overwriteOutput:
+        raise ExecuteError(f"ERROR 000258: Output {path} already exists")
+    table = WORKSPACE[path] = FeatureClass(geometry_type, spatial_reference)
+    for template_path in ([template] if isinstance(template, str) else template or []):
+        existing = {field.name for field in table.fields}
+        table.fields.extend(field for field in _Table(template_path).fields if field.name not in existing)
+    return _Result(path)
+
+
+def AddField_management(in_table, field_name, field_type, field_precision=None, field_scale=None,
+                        field_length=None, **kwargs):
+    COUNTS["AddField"] += 1
+    _Table(in_table).fields.append(Field(field_name, field_type, field_length))
+    return _Result(in_table)
+
+
+def AddFields_management(in_table, field_description, **kwargs):
+    COUNTS["AddFields"] += 1
+    table = _Table(in_table)
+    for name, field_type, *options in field_description:
+        length = options[1] if len(options) > 1 and options[1] != "" else None
+        table.fields.append(Field(name, field_type, length))
+    return _Result(in_table)
+
+
+def GetCount_management(in_rows):
+    COUNTS["GetCount"] += 1
+    return _Result(str(len(_Table(in_rows).rows)))
+
+
+def CopyFeatures_management(in_features, out_feature_class, **kwargs):
+    COUNTS["CopyFeatures"] += 1
+    if out_feature_class in WORKSPACE and not env.overwriteOutput:
+        raise ExecuteError(f"ERROR 000258: Output {out_feature_class} already exists")
+    source = _Table(in_features)
+    table = WORKSPACE[out_feature_class] = FeatureClass(source.shapeType, source.spatialReference)
+    table.fields = list(source.fields)
+    for row in source.rows:
+        table.Insert(dict(row))
+    return _Result(out_feature_class)
+
+
+def Delete_management(in_data):
+    COUNTS["Delete"] += 1
+    WORKSPACE.pop(in_data, None)
+    return _Result("true")
+
+
+# === Cursors ===
+class _Cursor:
+    def __init__(self, in_table, field_names, where_clause=None, **kwargs):
+        COUNTS[type(self).__name__] += 1
+        self.table = _Table(in_table)
+        self.fields = [field_names] if isinstance(field_names, str) else list(field_names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def _Values(self, row):
+        return [row.get(field) for field in self.fields]
+
+
+class SearchCursor(_Cursor):
+    def __iter__(self):
+        for row in list(self.table.rows):
+            yield tuple(self._Values(row))
+
+
+class InsertCursor(_Cursor):
+    def insertRow(self, row):
+        COUNTS["insertRow"] += 1
+        return self.table.Insert(dict(zip(self.fields, row)))
+
+
+class UpdateCursor(_Cursor):
+    def __iter__(self):
+        for row in list(self.table.rows):
+            self._row = row
+            yield self._Values(row)
+
+    def updateRow(self, values):
+        COUNTS["updateRow"] += 1
+        self._row.update(zip(self.fields, values))
+
+    def deleteRow(self):
+        COUNTS["deleteRow"] += 1
+        self.table.rows.remove(self._row)
+
+
+# === Edit sessions ===
+class Editor:
+    """Edit session over the whole workspace; aborts and unsaved stops restore every table's rows"""
+
+    def __init__(self, workspace):
+        COUNTS["Editor"] += 1
+        self.workspace = workspace
+        self._session = None
+        self._operation = None
+
+    @staticmethod
+    def _Snapshot():
+        return {path: list(table.rows) for path, table in WORKSPACE.items()}
+
+    @staticmethod
+    def _Restore(snapshot):
+        for path, rows in snapshot.items():
+            if path in WORKSPACE:
+                WORKSPACE[path].rows[:] = rows
+
+    @property
+    def isEditing(self):
+        return self._session is not None
+
+    def startEditing(self, with_undo=True, multiuser_mode=True):
+        COUNTS["startEditing"] += 1
+        self._session = self._Snapshot()
+
+    def startOperation(self):
+        COUNTS["startOperation"] += 1
+        self._operation = self._Snapshot()
+
+    def stopOperation(self):
+        self._operation = None
+
+    def abortOperation(self):
+        COUNTS["abortOperation"] += 1
+        self._Restore(self._operation)
+        self._operation = None
+
+    def stopEditing(self, save_changes=True):
+        COUNTS["commits" if save_changes else "rollbacks"] += 1
+        if not save_changes:
+            self._Restore(self._session)
+        self._session = None
+
+
+class da:
+    SearchCursor = SearchCursor
+    InsertCursor = InsertCursor
+    UpdateCursor = UpdateCursor
+    Editor = Editor
+
+
+# === Mapping ===
+# ArcGISProject("CURRENT") fails as it does outside ArcGIS Pro until OpenProject() opens
+# a project with one empty active map; layers and layer files are plain Python objects
+PROJECT = None
+
+
+def _ConnectionProperties(path):
+    """connectionProperties of a layer on path, with the workspace factory of its workspace"""
+    workspace, dataset = os.path.split(path)
+    factories = {".gdb": "File Geodatabase", ".sde": "SDE"}
+    factory = factories.get(os.path.splitext(workspace)[1].lower(), "Shape File")
+    return {"dataset": dataset, "workspace_factory": factory, "connection_info": {"database": workspace}}
+
+
+class _Layer:
+    def __init__(self, name, path="", layers=None):
+        self.name = name
+        self.isGroupLayer = layers is not None
+        self.layers = layers if layers is not None else []
+        self.connectionProperties = None if self.isGroupLayer else _ConnectionProperties(path)
+        self._definition = object()
+
+    @property
+    def dataSource(self):
+        properties = self.connectionProperties
+        return os.path.join(properties["connection_info"]["database"], properties["dataset"])
+
+    def supports(self, property_name):
+        return property_name == "DATASOURCE" and not self.isGroupLayer
+
+    def listLayers(self):
+        return [nested for layer in self.layers for nested in [layer] + layer.listLayers()]
+
+    def getDefinition(self, version):
+        return self._definition
+
+    def setDefinition(self, definition):
+        COUNTS["setDefinition"] += 1
+        self._definition = definition
+
+    def updateConnectionProperties(self, current_connection_info, new_connection_info):
+        COUNTS["updateConnectionProperties"] += 1
+        if current_connection_info == self.connectionProperties:
+            self.connectionProperties = new_connection_info
+
+    def _Copy(self):
+        copy = _Layer(self.name, layers=[layer._Copy() for layer in self.layers] if self.isGroupLayer else None)
+        copy.connectionProperties = self.connectionProperties
+        return copy
+
+
+class _Map(_Layer):
+    def __init__(self):
+        super().__init__("Map", layers=[])
+
+    def _Insert(self, layers, layer, position):
+        added = layer._Copy()
+        layers.insert(0 if position == "TOP" else len(layers), added)
+        return [added]
+
+    def addLayer(self, layer, add_position="AUTO_ARRANGE"):
+        COUNTS["addLayer"] += 1
+        return self._Insert(self.layers, layer, add_position)
+
+    def addLayerToGroup(self, target_group_layer, add_layer, add_position="AUTO_ARRANGE"):
+        COUNTS["addLayerToGroup"] += 1
+        return self._Insert(target_group_layer.layers, add_layer, add_position)
+
+    def addDataFromPath(self, data_path):
+        COUNTS["addDataFromPath"] += 1
+        return self._Insert(self.layers, _Layer(os.path.basename(data_path), data_path), "TOP")[0]
+
+    def createGroupLayer(self, name, target_group_layer=None):
+        COUNTS["createGroupLayer"] += 1
+        layers = target_group_layer.layers if target_group_layer else self.layers
+        return self._Insert(layers, _Layer(name, layers=[]), "TOP")[0]
+
+
+def OpenProject():
+    """Make ArcGISProject("CURRENT") available with an empty active map (returns the map)"""
+    global PROJECT
+    PROJECT = type("Project", (), {"activeMap": _Map()})()
+    return PROJECT.activeMap
+
+
+def MakeFeatureLayer_management(in_features, out_layer, **kwargs):
+    _Table(in_features)
+    return _Result(_Layer(out_layer, in_features))
+
+
+class mp:
+    class ArcGISProject:
+        def __new__(cls, path):
+            if PROJECT is None:
+                raise OSError("ArcGISProject: CURRENT is only available inside ArcGIS Pro")
+            return PROJECT
+
+    class LayerFile:
+        """.lyrx layer document; one layer per entry of its layerDefinitions"""
+
+        def __init__(self, path):
+            COUNTS["LayerFile"] += 1
+            with open(path, encoding="utf-8") as document:
+                definitions = json.load(document)["layerDefinitions"]
+            self.layers = [_Layer(definition["name"]) for definition in definitions
+                           if definition.get("type") != "CIMGroupLayer"]
+
+        def listLayers(self):
+            return list(self.layers)
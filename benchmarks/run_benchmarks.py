@@ -0,0 +1,354 @@
+# === Profile benchmarks ===
+# Runs the full PLAN_AND_PROFILE main() pipeline against the fake_arcpy stand-in (and
+# generate_profile against real arcpy when it is installed), sweeping row_number,
+# width/depth dimensions, point counts and write methods. Each run writes a JSON report
+# with timings, throughput, per-stage metrics and arcpy call/allocation counts.
+#
+#   python benchmarks/run_benchmarks.py                     # axis sweeps, fake arcpy
+#   python benchmarks/run_benchmarks.py --arcpy both --grid  # full cartesian sweep
+#   python benchmarks/run_benchmarks.py --rows 1,100,10000 --points 1 --label 1.4.0
+
+import argparse
+import datetime
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path[:0] = [REPO_DIR, BENCHMARK_DIR]
+
+import numpy as np
+
+REPORT_VERSION = 1
+
+# === Sweep defaults ===
+# Each axis is swept on its own around the baseline case unless --grid is given
+BASELINE = {"points": 10, "row_number": 10, "width": (10, 8), "depth": (3, 4), "write_method": "CURSOR",
+            "stage_in_memory": False, "concurrency": "", "chunk_size": 0}
+DEFAULT_SWEEPS = {
+    "row_number": [1, 10, 100, 1000, 10000],
+    "points": [1, 10, 100, 1000],
+    "width": [(1, 1), (10, 8), (100, 80), (1000, 800)],
+    "depth": [(1, 1), (3, 4), (30, 40), (300, 400)],
+    "write_method": ["CURSOR", "WKB"],
+    "stage_in_memory": [False, True],
+    "concurrency": ["", "THREADS"],
+    "chunk_size": [0, 100, 1000, 10000],
+}
+INPUT_LENGTH = 20
+POINT_SPACING = 5000.0
+
+
+def ParseList(text, convert=int):
+    return [convert(item) for item in text.split(",") if item.strip()]
+
+
+def ParsePair(text):
+    """'10:8' -> (10, 8); a single value is used for both sides"""
+    values = [int(value) for value in text.split(":")]
+    return (values[0], values[-1])
+
+
+def ConcurrencyMode(text):
+    """Concurrency parameter value for a mode name (SEQUENTIAL -> empty)"""
+    mode = text.strip().upper()
+    return "" if mode == "SEQUENTIAL" else mode
+
+
+def BenchmarkCases(sweeps, grid=False):
+    """Expand the sweeps into case dictionaries (one axis at a time, or their product)"""
+    if grid:
+        names = list(sweeps)
+        return [dict(zip(names, values)) for values in itertools.product(*sweeps.values())]
+
+    cases = []
+    for name, values in sweeps.items():
+        for value in values:
+            case = dict(BASELINE, **{name: value})
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+
+def ToolParameters(case, input_points, workspace, metrics_log):
+    """Tool parameter values in ModelBuilder order for one case"""
+    return [
+        input_points,
+        os.path.join(workspace, "profile_lines"),
+        os.path.join(workspace, "bore_line"),
+        os.path.join(workspace, "depth_polygons"),
+        INPUT_LENGTH,
+        case["row_number"],
+        "SAND",
+        "CLAY",
+        case["depth"][0],
+        case["depth"][1],
+        case["width"][0],
+        case["width"][1],
+        "Benchmark",
+        "",
+        case["write_method"],
+        metrics_log,
+        case["stage_in_memory"],
+        "",
+        case["concurrency"],
+        case["chunk_size"],
+    ]
+
+
+def PointCoordinates(count):
+    """Input points on a square grid far enough apart that profiles never overlap"""
+    columns = max(1, int(np.ceil(np.sqrt(count))))
+    return [((index % columns) * POINT_SPACING, (index // columns) * POINT_SPACING) for index in range(count)]
+
+
+def ReadMetricsLog(path):
+    """Return the last run recorded in a metrics_log file"""
+    with open(path, encoding="utf-8") as log_file:
+        return json.loads(log_file.readlines()[-1])
+
+
+def Summarize(case, timings, record, calls):
+    """Report entry for one case: best/mean time, throughput and the best run's stages"""
+    best = min(timings)
+    rows = sum(record["rows"].values())
+    return {
+        "case": dict(case, width=list(case["width"]), depth=list(case["depth"])),
+        "repeat": len(timings),
+        "seconds": {"best": round(best, 6), "mean": round(statistics.mean(timings), 6),
+                    "all": [round(timing, 6) for timing in timings]},
+        "profile_count": record["profile_count"],
+        "rows": record["rows"],
+        "profiles_per_second": round(record["profile_count"] / best, 3) if best else None,
+        "rows_per_second": round(rows / best, 3) if best else None,
+        "peak_rss_mb": record.get("peak_rss_mb"),
+        "stages": record["stages"],
+        "calls": calls,
+    }
+
+
+class FakeRunner:
+    """Runs PLAN_AND_PROFILE.main() with the fake_arcpy stand-in installed as arcpy"""
+
+    mode = "fake"
+
+    def __init__(self):
+        import fake_arcpy
+        self.arcpy = fake_arcpy.Install()
+        import PLAN_AND_PROFILE
+        import profile_geometry
+        self.tool = PLAN_AND_PROFILE
+        self.geometry = profile_geometry
+
+    def Run(self, case, repeat, scratch):
+        metrics_log = os.path.join(scratch, "fake_metrics.jsonl")
+        timings, record, calls = [], None, None
+        for _ in range(repeat):
+            self.arcpy.Reset(ToolParameters(case, "points", "bench.gdb", metrics_log))
+            self.arcpy.env.overwriteOutput = True
+            self.arcpy.AddPoints("points", PointCoordinates(case["points"]))
+            self.geometry.ProfileTemplate.cache_clear()
+
+            start = time.perf_counter()
+            self.tool.main()
+            timings.append(time.perf_counter() - start)
+
+            errors = [message for level, message in self.arcpy.MESSAGES if level == "ERROR"]
+            if errors:
+                raise RuntimeError("; ".join(errors))
+            if timings[-1] == min(timings):
+                record, calls = ReadMetricsLog(metrics_log), dict(sorted(self.arcpy.COUNTS.items()))
+        return Summarize(case, timings, record, calls)
+
+
+class ArcpyRunner:
+    """Runs generate_profile against real arcpy in a scratch file geodatabase"""
+
+    mode = "real"
+
+    def __init__(self):
+        import arcpy
+        import profile_generator
+        import profile_geometry
+        self.arcpy = arcpy
+        self.generator = profile_generator
+        self.geometry = profile_geometry
+        self.arcpy.env.overwriteOutput = True
+
+    def InputPoints(self, workspace, count):
+        path = os.path.join(workspace, f"points_{count}")
+        if not self.arcpy.Exists(path):
+            self.arcpy.CreateFeatureclass_management(workspace, f"points_{count}", "POINT",
+                                                     spatial_reference=self.arcpy.SpatialReference(3857))
+            with self.arcpy.da.InsertCursor(path, ["SHAPE@XY"]) as cursor:
+                for point in PointCoordinates(count):
+                    cursor.insertRow([point])
+        return path
+
+    def Run(self, case, repeat, scratch):
+        workspace = os.path.join(scratch, "bench.gdb")
+        if not self.arcpy.Exists(workspace):
+            self.arcpy.CreateFileGDB_management(scratch, "bench.gdb")
+        input_points = self.InputPoints(workspace, case["points"])
+        metrics_log = os.path.join(scratch, "arcpy_metrics.jsonl")
+
+        timings, record = [], None
+        for _ in range(repeat):
+            params = self.generator.ParametersFromText(ToolParameters(case, input_points, workspace, metrics_log),
+                                                       add_to_map=False)
+            self.geometry.ProfileTemplate.cache_clear()
+            start = time.perf_counter()
+            self.generator.generate_profile(params)
+            timings.append(time.perf_counter() - start)
+            if timings[-1] == min(timings):
+                record = ReadMetricsLog(metrics_log)
+        return Summarize(case, timings, record, None)
+
+
+def ArcpyAvailable():
+    return importlib.util.find_spec("arcpy") is not None
+
+
+def GitRevision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def RealArguments(argv):
+    """Command line arguments with --arcpy replaced by --arcpy real"""
+    arguments, skip = [], False
+    for argument in argv:
+        if skip:
+            skip = False
+        elif argument == "--arcpy":
+            skip = True
+        elif not argument.startswith("--arcpy="):
+            arguments.append(argument)
+    return arguments + ["--arcpy", "real"]
+
+
+RUNNERS = {"fake": FakeRunner, "real": ArcpyRunner}
+
+
+def RunIsolated(mode, case, repeat):
+    """Run one case in a fresh interpreter so its peak RSS is not inflated by earlier cases"""
+    command = [sys.executable, os.path.abspath(__file__), "--arcpy", mode, "--repeat", str(repeat),
+               "--case", json.dumps(case)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def CaseDescription(case):
+    options = [case["write_method"]]
+    if case["stage_in_memory"]:
+        options.append("staged")
+    if case["concurrency"]:
+        options.append(case["concurrency"])
+    if case["chunk_size"]:
+        options.append(f"chunk={case['chunk_size']}")
+    return (f"points={case['points']} rows={case['row_number']} width={tuple(case['width'])} "
+            f"depth={tuple(case['depth'])} " + " ".join(options))
+
+
+def RunBenchmarks(mode, cases, repeat, label=None, isolate=False):
+    """Run every case and return the report dictionary"""
+    runner = None if isolate else RUNNERS[mode]()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="profile_bench_") as scratch:
+        for number, case in enumerate(cases, start=1):
+            entry = RunIsolated(mode, case, repeat) if isolate else runner.Run(case, repeat, scratch)
+            results.append(entry)
+            print(f"[{mode} {number}/{len(cases)}] {CaseDescription(case)}: "
+                  f"{entry['seconds']['best']:.4f}s, {entry['rows_per_second']:,.0f} rows/s, "
+                  f"peak RSS {entry['peak_rss_mb']} MB")
+    return {
+        "report_version": REPORT_VERSION,
+        "label": label,
+        "arcpy": mode,
+        "isolated": isolate,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": GitRevision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the profile pipeline against fake and/or real arcpy")
+    parser.add_argument("--arcpy", choices=("fake", "real", "both", "auto"), default="auto",
+                        help="arcpy to benchmark against; auto adds real arcpy when it is installed (default)")
+    parser.add_argument("--rows", help="row_number values, e.g. 1,10,100,1000,10000")
+    parser.add_argument("--points", help="Point counts, e.g. 1,10,100")
+    parser.add_argument("--widths", help="width_dimension1:width_dimension2 pairs, e.g. 10:8,100:80")
+    parser.add_argument("--depths", help="depth_dimension1:depth_dimension2 pairs, e.g. 3:4,30:40")
+    parser.add_argument("--write-methods", help="Write methods, e.g. CURSOR,WKB")
+    parser.add_argument("--stage", choices=("off", "on", "both"),
+                        help="Sweep stage_in_memory off, on or both")
+    parser.add_argument("--concurrency", help="Concurrency modes, e.g. SEQUENTIAL,THREADS (PROCESSES needs real arcpy)")
+    parser.add_argument("--chunk-sizes", help="chunk_size values, e.g. 0,1000,100000 (0 = no streaming)")
+    parser.add_argument("--grid", action="store_true", help="Run the full product of the sweeps instead of one axis at a time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best run is reported (default 3)")
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run every case in its own process so peak RSS is measured per case")
+    parser.add_argument("--case", help=argparse.SUPPRESS)  # Single JSON case, used by --isolate
+    parser.add_argument("--label", help="Release or build label stored in the report")
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results"),
+                        help="Report directory (default benchmarks/results)")
+    args = parser.parse_args()
+
+    if args.case:
+        with tempfile.TemporaryDirectory(prefix="profile_bench_") as scratch:
+            print(json.dumps(RUNNERS[args.arcpy]().Run(json.loads(args.case), args.repeat, scratch)))
+        return
+
+    # Only the axes given on the command line are swept when any are given
+    overrides = {
+        "row_number": args.rows and ParseList(args.rows),
+        "points": args.points and ParseList(args.points),
+        "width": args.widths and ParseList(args.widths, ParsePair),
+        "depth": args.depths and ParseList(args.depths, ParsePair),
+        "write_method": args.write_methods and ParseList(args.write_methods, str.upper),
+        "stage_in_memory": args.stage and {"off": [False], "on": [True], "both": [False, True]}[args.stage],
+        "concurrency": args.concurrency and ParseList(args.concurrency, ConcurrencyMode),
+        "chunk_size": args.chunk_sizes and ParseList(args.chunk_sizes),
+    }
+    sweeps = {name: values for name, values in overrides.items() if values} or DEFAULT_SWEEPS
+    if args.grid:
+        sweeps = {name: sweeps.get(name, [BASELINE[name]]) for name in BASELINE}
+    cases = BenchmarkCases(sweeps, args.grid)
+
+    modes = {"fake": ["fake"], "real": ["real"], "both": ["fake", "real"],
+             "auto": ["fake", "real"] if ArcpyAvailable() else ["fake"]}[args.arcpy]
+    if "real" in modes and not ArcpyAvailable():
+        parser.error("arcpy is not installed")
+
+    os.makedirs(args.output, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    for mode in modes:
+        # Real arcpy runs in a separate process so the fake module never shadows it
+        if mode == "real" and "fake" in modes:
+            subprocess.run([sys.executable, os.path.abspath(__file__), *RealArguments(sys.argv[1:])], check=True)
+            continue
+
+        report = RunBenchmarks(mode, cases, args.repeat, args.label, args.isolate)
+        path = os.path.join(args.output, f"{stamp}-{mode}.json")
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
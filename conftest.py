@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+import profile_generator
+import profile_geometry
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import fake_arcpy  # noqa: E402
+
+# Two profiles 500ft apart on the same east-west line
+POINTS = [(1000.0, 2000.0), (1500.0, 2000.0)]
+
+DEFAULT_PARAMETERS = dict(
+    input_points="", output_lines="", bore_line="", depth_polygons="",
+    input_length=100, row_number=4, depth_type1="HDD", depth_type2="OPEN",
+    depth_dimension1=2, depth_dimension2=3, width_dimension1=4, width_dimension2=5, title="Profile A",
+    points=POINTS, spatial_reference=None, add_to_map=False,
+)
+
+
+@pytest.fixture
+def profile_parameters():
+    """Build ProfileParameters for the two POINTS profiles, overriding any value by keyword"""
+    def Build(**options):
+        return profile_generator.ProfileParameters(**{**DEFAULT_PARAMETERS, **options})
+    return Build
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    profile_geometry.ProfileTemplate.cache_clear()
+    yield
+    profile_geometry.ProfileTemplate.cache_clear()
+
+
+@pytest.fixture
+def arcpy():
+    """benchmarks/fake_arcpy registered as arcpy with an empty workspace and scratch geodatabase, restored afterwards"""
+    previous = sys.modules.get("arcpy")
+    module = fake_arcpy.Install()
+    fake_arcpy.Reset()
+    fake_arcpy.WORKSPACE.clear()
+    module.env.overwriteOutput = True
+    yield module
+    fake_arcpy.Reset()
+    if previous is None:
+        sys.modules.pop("arcpy", None)
+    else:
+        sys.modules["arcpy"] = previous
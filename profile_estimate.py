@@ -0,0 +1,156 @@
+# === Layout estimates ===
+# Analytical feature counts, vertex counts, extents and write-cost estimates for a
+# profile run. Nothing here builds geometry or touches a workspace, so an estimate for
+# thousands of profiles takes milliseconds and can run on every parameter change.
+
+import numpy as np
+
+import profile_geometry
+
+# === Write cost model ===
+# (seconds per output, seconds per row, seconds per vertex) for CURSOR writes by
+# workspace kind; rough figures to be refined from benchmark reports
+WRITE_COSTS = {
+    "memory": (0.01, 2e-6, 1e-7),
+    "file_gdb": (0.3, 2e-5, 5e-7),
+    "enterprise_gdb": (1.5, 2e-4, 2e-6),
+    "folder": (0.2, 4e-5, 5e-7),
+    "geojson": (0.001, 1e-5, 3e-7),
+    "geopackage": (0.01, 5e-6, 1e-7),
+    "flatgeobuf": (0.001, 8e-6, 5e-8),
+}
+METHOD_FACTORS = {"CURSOR": 1.0, "WKB": 0.6}  # Row cost relative to CURSOR
+COPY_FACTOR = 0.25                           # Bulk copy row cost relative to inserting
+
+
+def WorkspaceKind(path):
+    """Classify an output path as memory, file_gdb, enterprise_gdb, a file format or folder (shapefiles etc.)"""
+    normalized = path.replace("\\", "/").lower()
+    if normalized.startswith(("memory/", "in_memory/")):
+        return "memory"
+    if ".gpkg/" in normalized:
+        return "geopackage"
+    if normalized.endswith((".geojson", ".json")):
+        return "geojson"
+    if normalized.endswith(".fgb"):
+        return "flatgeobuf"
+    if ".sde/" in normalized:
+        return "enterprise_gdb"
+    if ".gdb/" in normalized:
+        return "file_gdb"
+    return "folder"
+
+
+def _GroupFeatures(part_counts, chunk_size):
+    """Features left after merging groups of part_counts parts when every chunk_size parts are written apart"""
+    if chunk_size <= 0:
+        return sum(1 for count in part_counts if count)
+    features, start = 0, 0
+    for count in part_counts:
+        if count:
+            features += (start + count - 1) // chunk_size - start // chunk_size + 1
+        start += count
+    return features
+
+
+def ProfileCounts(row_number, per_row_verticals=False, multipart=False, chunk_size=0):
+    """(features, vertices) of one profile for each output"""
+    # Bore line (3 vertices), 4 ticks and the combined line, then the grid rules and rails
+    rules = max(row_number, 0)
+    rails = profile_geometry.GridRailCount(rules, per_row_verticals) if rules else 0
+    rail_side = rails // 2
+    part_counts = [1, 4, 1, rules, rail_side, rail_side]
+    parts = sum(part_counts)
+    line_features = _GroupFeatures(part_counts, chunk_size) if multipart else parts
+    return {
+        "output_lines": (line_features, 3 + 2 * (parts - 1)),
+        "depth_polygons": (3, 15),  # West, east and background rings of 5 vertices
+        "bore_line": (1, 2),
+        "grid_cells": (rules, 5 * rules),  # One ring per row
+    }
+
+
+def ProfileExtents(origins):
+    """(xmin, ymin, xmax, ymax) of every profile as an (n, 4) array, including any bearing rotation"""
+    half = np.array([origin.half_length for origin in origins], dtype=float)
+    rows = np.array([origin.row_number for origin in origins])
+    rows_above, rows_below = rows // 2, rows - rows // 2
+    deepest = np.array([max(origin.depth_dimension1, origin.depth_dimension2) for origin in origins], dtype=float)
+    width1 = np.array([origin.width_dimension1 for origin in origins], dtype=float)
+    width2 = np.array([origin.width_dimension2 for origin in origins], dtype=float)
+
+    # Local frame box: grid and ticks across, grid rows and depth rectangles down
+    left = -(half + width2 + 1)
+    right = half + width1 + 1
+    bottom = np.minimum(-rows_below, rows_above - deepest)
+    top = rows_above.astype(float)
+    corners = np.stack([np.stack([left, bottom], 1), np.stack([left, top], 1),
+                        np.stack([right, top], 1), np.stack([right, bottom], 1)], 1)
+
+    # One batched rotation of every corner, then the origins' translation
+    bearing = np.array([90.0 if origin.bearing is None else origin.bearing for origin in origins])
+    angle = np.radians(90.0 - bearing)
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    x = corners[..., 0] * cos - corners[..., 1] * sin + np.array([origin.x for origin in origins])[:, None]
+    y = corners[..., 0] * sin + corners[..., 1] * cos + np.array([origin.y for origin in origins])[:, None]
+    return np.stack([x.min(1), y.min(1), x.max(1), y.max(1)], 1)
+
+
+def WriteSeconds(path, rows, vertices, method="CURSOR", staged=False):
+    """Estimated seconds to create and fill one output at path"""
+    per_output, per_row, per_vertex = WRITE_COSTS[WorkspaceKind(path)]
+    factor = METHOD_FACTORS.get(method, 1.0)
+    if staged:
+        # Rows are inserted in the memory workspace, then bulk-copied to the target
+        memory_output, memory_row, memory_vertex = WRITE_COSTS["memory"]
+        return (memory_output + per_output + rows * (memory_row * factor + per_row * COPY_FACTOR)
+                + vertices * (memory_vertex + per_vertex * COPY_FACTOR))
+    return per_output + rows * per_row * factor + vertices * per_vertex
+
+
+def EstimateLayout(origins, paths, write_methods, per_row_verticals=False, multipart=False, chunk_size=0,
+                   staged=False):
+    """Counts, extent and estimated write seconds for writing every origin's profile to paths"""
+    totals = {output: [0, 0] for output in paths}
+    for origin in origins:
+        counts = ProfileCounts(origin.row_number, per_row_verticals, multipart, chunk_size)
+        for output, (features, vertices) in counts.items():
+            if output not in totals:
+                continue
+            totals[output][0] += features
+            totals[output][1] += vertices
+
+    outputs = {}
+    for output, (features, vertices) in totals.items():
+        outputs[output] = {
+            "path": paths[output],
+            "workspace": WorkspaceKind(paths[output]),
+            "features": features,
+            "vertices": vertices,
+            "seconds": round(WriteSeconds(paths[output], features, vertices, write_methods[output], staged), 3),
+        }
+
+    extents = ProfileExtents(origins)
+    extent = [float(value) for value in (*extents[:, :2].min(0), *extents[:, 2:].max(0))]
+    return {
+        "profiles": len(origins),
+        "features": sum(output["features"] for output in outputs.values()),
+        "vertices": sum(output["vertices"] for output in outputs.values()),
+        "seconds": round(sum(output["seconds"] for output in outputs.values()), 3),
+        "extent": extent,
+        "outputs": outputs,
+    }
+
+
+def EstimateSummary(estimate):
+    """Estimate report lines for AddMessage"""
+    lines = [
+        f"{output['path']}: {output['features']:,} features, {output['vertices']:,} vertices, "
+        f"~{output['seconds']:,.1f}s ({output['workspace']})"
+        for output in estimate["outputs"].values()
+    ]
+    xmin, ymin, xmax, ymax = estimate["extent"]
+    lines.append(f"{estimate['profiles']:,} profile(s): {estimate['features']:,} features, "
+                 f"~{estimate['seconds']:,.1f}s to write")
+    lines.append(f"Extent: {xmin:,.3f}, {ymin:,.3f} - {xmax:,.3f}, {ymax:,.3f}")
+    return lines
@@ -0,0 +1,613 @@
+# === File format backends ===
+# arcpy-free writer backends streaming the outputs into GeoJSON, GeoPackage (stdlib
+# sqlite3) or FlatGeobuf files, so profiles can be generated on machines without
+# ArcGIS Pro. They plug into profile_writers like ArcpyBackend: CURSOR writes pass the
+# vertex arrays from Geometry, WKB writes pass WKB bytes, and both are stored as-is.
+
+import json
+import os
+import sqlite3
+import struct
+import threading
+
+import numpy as np
+
+import profile_writers
+
+# === Formats ===
+FORMAT_GEODATABASE = ""          # arcpy geodatabase outputs (ArcpyBackend)
+FORMAT_GEOJSON = "GEOJSON"       # One FeatureCollection file per output
+FORMAT_GEOPACKAGE = "GPKG"       # One table per output in a .gpkg file (path: file.gpkg/table)
+FORMAT_FLATGEOBUF = "FLATGEOBUF" # One .fgb file per output
+FORMATS = (FORMAT_GEODATABASE, FORMAT_GEOJSON, FORMAT_GEOPACKAGE, FORMAT_FLATGEOBUF)
+
+# Output path extensions selecting a format when none is given
+FORMAT_EXTENSIONS = {".geojson": FORMAT_GEOJSON, ".json": FORMAT_GEOJSON, ".gpkg": FORMAT_GEOPACKAGE,
+                     ".fgb": FORMAT_FLATGEOBUF}
+
+# WKT keywords that mark the definition part of an ESRI spatial reference string
+_WKT_KEYWORDS = ("PROJCS", "GEOGCS", "GEOCCS", "VERTCS", "COMPD_CS", "PROJCRS", "GEOGCRS", "COMPOUNDCRS")
+
+
+def PathFormat(path):
+    """Format implied by an output path's extension (a .gpkg anywhere in it), geodatabase otherwise"""
+    normalized = path.replace("\\", "/").lower()
+    if ".gpkg/" in normalized or normalized.endswith(".gpkg"):
+        return FORMAT_GEOPACKAGE
+    return FORMAT_EXTENSIONS.get(os.path.splitext(normalized)[1], FORMAT_GEODATABASE)
+
+
+def FormatBackend(output_format):
+    """Writer backend for an output format (None for geodatabases, which use ArcpyBackend)"""
+    backends = {FORMAT_GEOJSON: GeoJSONBackend, FORMAT_GEOPACKAGE: GeoPackageBackend,
+                FORMAT_FLATGEOBUF: FlatGeobufBackend}
+    return backends[output_format]() if output_format in backends else None
+
+
+def SpatialReferenceInfo(spatial_ref):
+    """(EPSG code, name, WKT) of an arcpy SpatialReference or an EPSG code; code 0 and no WKT when unknown"""
+    if spatial_ref is None:
+        return 0, "Undefined", ""
+    if isinstance(spatial_ref, int):
+        return spatial_ref, f"EPSG:{spatial_ref}", ""
+    code = getattr(spatial_ref, "factoryCode", 0) or 0
+    name = getattr(spatial_ref, "name", "") or f"EPSG:{code}"
+    # The ESRI spatial reference string is the WKT followed by ;-separated domain values
+    text = spatial_ref.exportToString().split(";")[0] if hasattr(spatial_ref, "exportToString") else ""
+    wkt = text if text.lstrip().upper().startswith(_WKT_KEYWORDS) else ""
+    return code, name, wkt
+
+
+# === Shapes ===
+def ShapeParts(shape):
+    """(n, 2) vertex arrays of each part of a shape from Geometry (array or list of arrays) or WKB bytes"""
+    if isinstance(shape, list):
+        return shape
+    if not isinstance(shape, (bytes, bytearray)):
+        return [shape]
+    return profile_writers.DecodeWKB(shape)
+
+
+def _Envelope(parts):
+    """(min_x, min_y, max_x, max_y) of every vertex in parts"""
+    coords = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    return (*coords.min(0).tolist(), *coords.max(0).tolist())
+
+
+class _FileTable:
+    """Schema and running state of one output written by a file backend"""
+
+    def __init__(self, geometry_type, schema, spatial_ref):
+        self.geometry_type = geometry_type
+        self.schema = list(schema)
+        self.spatial_ref = spatial_ref
+        self.count = 0
+        self.envelope = None
+
+    def Extend(self, envelope):
+        """Grow the output's extent by one feature's envelope"""
+        if self.envelope is None:
+            self.envelope = envelope
+        else:
+            self.envelope = (min(self.envelope[0], envelope[0]), min(self.envelope[1], envelope[1]),
+                             max(self.envelope[2], envelope[2]), max(self.envelope[3], envelope[3]))
+
+
+class _FileBackend:
+    """Shared parts of the file backends: table state, vertex-array geometries and file deletion"""
+
+    def __init__(self):
+        self.tables = {}
+
+    def Geometry(self, geometry_type, vertices, spatial_ref):
+        return vertices
+
+    def Exists(self, path):
+        return os.path.exists(path)
+
+    def Delete(self, path):
+        """Delete path if it exists"""
+        self.tables.pop(path, None)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def Table(self, path):
+        """State of an output created by this backend"""
+        if path not in self.tables:
+            raise OSError(f"{path} was not created by this backend")
+        return self.tables[path]
+
+
+class _FileCursor:
+    """Insert cursor base: maps the writer's field order onto the schema and writes each row"""
+
+    def __init__(self, table, fields):
+        self.table = table
+        names = [name for name, _, _ in table.schema]
+        self.positions = [names.index(field) for field in fields[1:]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def Values(self, row):
+        """Attribute values of row in schema order"""
+        values = [None] * len(self.table.schema)
+        for position, value in zip(self.positions, row[1:]):
+            values[position] = value
+        return values
+
+    def insertRow(self, row):
+        parts = ShapeParts(row[0])
+        envelope = _Envelope(parts)
+        self.table.Extend(envelope)
+        self.table.count += 1
+        self.Write(parts, envelope, self.Values(row))
+
+    def Write(self, parts, envelope, values):
+        raise NotImplementedError
+
+
+# === GeoJSON ===
+class GeoJSONBackend(_FileBackend):
+    """Streams every output into a GeoJSON FeatureCollection file
+
+    The file is complete whenever no cursor is open: each cursor reopens it in place of
+    the closing brackets, appends its features and writes the brackets back. The
+    spatial reference is recorded in the legacy crs member.
+    """
+
+    FOOTER = b"\n]}\n"
+
+    def CreateFeatureClass(self, path, geometry_type, schema, spatial_ref):
+        code, _, _ = SpatialReferenceInfo(spatial_ref)
+        collection = {"type": "FeatureCollection", "name": os.path.splitext(os.path.basename(path))[0]}
+        if code:
+            collection["crs"] = {"type": "name", "properties": {"name": f"urn:ogc:def:crs:EPSG::{code}"}}
+        header = json.dumps(collection)[:-1] + ', "features": ['
+        with open(path, "wb") as collection_file:
+            collection_file.write(header.encode("utf-8") + self.FOOTER)
+        self.tables[path] = _FileTable(geometry_type, schema, spatial_ref)
+
+    def InsertCursor(self, path, fields):
+        return _GeoJSONCursor(path, self.Table(path), fields, self.FOOTER)
+
+
+class _GeoJSONCursor(_FileCursor):
+    def __init__(self, path, table, fields, footer):
+        super().__init__(table, fields)
+        self.path = path
+        self.footer = footer
+        self.names = [name for name, _, _ in table.schema]
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "r+b")
+        self._file.seek(-len(self.footer), os.SEEK_END)
+        self._file.truncate()
+        return self
+
+    def __exit__(self, *exc_info):
+        collection_file, self._file = self._file, None
+        collection_file.write(self.footer)
+        collection_file.close()
+        return False
+
+    def Write(self, parts, envelope, values):
+        if self.table.geometry_type == "POLYGON":
+            geometry = {"type": "Polygon", "coordinates": [parts[0].tolist()]}
+        elif len(parts) > 1:
+            geometry = {"type": "MultiLineString", "coordinates": [part.tolist() for part in parts]}
+        else:
+            geometry = {"type": "LineString", "coordinates": parts[0].tolist()}
+        feature = {"type": "Feature", "properties": dict(zip(self.names, values)), "geometry": geometry}
+        separator = b"\n" if self.table.count == 1 else b",\n"
+        self._file.write(separator + json.dumps(feature).encode("utf-8"))
+
+
+# === GeoPackage ===
+# Minimal GeoPackage 1.3: the three required metadata tables and one feature table per
+# output. Polylines are stored as MultiLineStrings, matching geodatabase polylines.
+_GPKG_APPLICATION_ID = 0x47504B47  # "GPKG"
+_GPKG_USER_VERSION = 10300
+_GPKG_GEOMETRY_TYPES = {"POLYLINE": "MULTILINESTRING", "POLYGON": "POLYGON"}
+_GPKG_FIELD_TYPES = {"TEXT": "TEXT", "LONG": "INTEGER", "SHORT": "SMALLINT", "DOUBLE": "DOUBLE", "FLOAT": "FLOAT"}
+_GPKG_METADATA = [
+    """CREATE TABLE IF NOT EXISTS gpkg_spatial_ref_sys (srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY,
+       organization TEXT NOT NULL, organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL,
+       description TEXT)""",
+    """CREATE TABLE IF NOT EXISTS gpkg_contents (table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL,
+       identifier TEXT UNIQUE, description TEXT DEFAULT '',
+       last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+       min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+       srs_id INTEGER REFERENCES gpkg_spatial_ref_sys(srs_id))""",
+    """CREATE TABLE IF NOT EXISTS gpkg_geometry_columns (table_name TEXT NOT NULL UNIQUE
+       REFERENCES gpkg_contents(table_name), column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+       srs_id INTEGER NOT NULL REFERENCES gpkg_spatial_ref_sys(srs_id), z TINYINT NOT NULL, m TINYINT NOT NULL,
+       PRIMARY KEY (table_name, column_name))""",
+]
+_GPKG_DEFAULT_SRS = [
+    ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", "undefined cartesian coordinate reference system"),
+    ("Undefined geographic SRS", 0, "NONE", 0, "undefined", "undefined geographic coordinate reference system"),
+    ("WGS 84 geodetic", 4326, "EPSG", 4326,
+     'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563]],PRIMEM["Greenwich",0],'
+     'UNIT["degree",0.0174532925199433]]', "longitude/latitude coordinates in decimal degrees on the WGS 84 spheroid"),
+]
+
+
+def SplitGeoPackagePath(path):
+    """(GeoPackage file, table name) of a file.gpkg/table output path"""
+    index = path.lower().find(".gpkg") + len(".gpkg")
+    table = path[index:].strip("/\\")
+    if index < len(".gpkg") or not table:
+        raise ValueError(f"GeoPackage output paths must name a table, e.g. profiles.gpkg/lines (got {path})")
+    return path[:index], table
+
+
+class GeoPackageBackend(_FileBackend):
+    """Writes every output as a feature table of a GeoPackage through sqlite3
+
+    Each cursor inserts its rows in one transaction. Outputs sharing a GeoPackage are
+    written one at a time, so concurrent writers wait for the file instead of failing
+    with a locked database.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def Lock(self, filename):
+        with self._locks_lock:
+            return self._locks.setdefault(os.path.abspath(filename), threading.Lock())
+
+    def Connect(self, filename):
+        connection = sqlite3.connect(filename, timeout=60, check_same_thread=False)
+        connection.execute(f"PRAGMA application_id = {_GPKG_APPLICATION_ID}")
+        connection.execute(f"PRAGMA user_version = {_GPKG_USER_VERSION}")
+        for statement in _GPKG_METADATA:
+            connection.execute(statement)
+        connection.executemany("INSERT OR IGNORE INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)",
+                               _GPKG_DEFAULT_SRS)
+        return connection
+
+    def SpatialReferenceID(self, connection, spatial_ref):
+        """srs_id for spatial_ref, registering it in gpkg_spatial_ref_sys when needed (-1 when unknown)"""
+        code, name, wkt = SpatialReferenceInfo(spatial_ref)
+        if not code:
+            return -1
+        connection.execute("INSERT OR IGNORE INTO gpkg_spatial_ref_sys VALUES (?, ?, 'EPSG', ?, ?, ?)",
+                           (name, code, code, wkt or "undefined", name))
+        return code
+
+    def CreateFeatureClass(self, path, geometry_type, schema, spatial_ref):
+        filename, table = SplitGeoPackagePath(path)
+        columns = ", ".join(
+            f'"{name}" {_GPKG_FIELD_TYPES.get(field_type, "TEXT")}' + (f"({length})" if length else "")
+            for name, field_type, length in schema
+        )
+        with self.Lock(filename), self.Connect(filename) as connection:
+            srs_id = self.SpatialReferenceID(connection, spatial_ref)
+            self.DropTable(connection, table)
+            connection.execute(f'CREATE TABLE "{table}" (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom '
+                               f'{_GPKG_GEOMETRY_TYPES[geometry_type]}, {columns})')
+            connection.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) "
+                               "VALUES (?, 'features', ?, ?)", (table, table, srs_id))
+            connection.execute("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, 0, 0)",
+                               (table, _GPKG_GEOMETRY_TYPES[geometry_type], srs_id))
+        connection.close()
+        self.tables[path] = _FileTable(geometry_type, schema, srs_id)
+
+    @staticmethod
+    def DropTable(connection, table):
+        connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        connection.execute("DELETE FROM gpkg_geometry_columns WHERE table_name = ?", (table,))
+        connection.execute("DELETE FROM gpkg_contents WHERE table_name = ?", (table,))
+
+    def InsertCursor(self, path, fields):
+        filename, table = SplitGeoPackagePath(path)
+        return _GeoPackageCursor(self, filename, table, self.Table(path), fields)
+
+    def UpdateCursor(self, path, fields):
+        filename, table = SplitGeoPackagePath(path)
+        return _GeoPackageUpdateCursor(self, filename, table, fields)
+
+    def Exists(self, path):
+        filename, table = SplitGeoPackagePath(path)
+        if not os.path.exists(filename):
+            return False
+        connection = sqlite3.connect(filename)
+        try:
+            return connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                      (table,)).fetchone() is not None
+        finally:
+            connection.close()
+
+    def Delete(self, path):
+        """Drop the output's table if it exists"""
+        filename, table = SplitGeoPackagePath(path)
+        self.tables.pop(path, None)
+        if os.path.exists(filename):
+            with self.Lock(filename), self.Connect(filename) as connection:
+                self.DropTable(connection, table)
+            connection.close()
+
+
+def GeoPackageBlob(parts, envelope, geometry_type, srs_id):
+    """GeoPackage geometry blob: header with the XY envelope, then little-endian WKB"""
+    if geometry_type == "POLYGON":
+        wkb = struct.pack("<BIII", 1, 3, 1, len(parts[0])) + parts[0].astype("<f8").tobytes()
+    else:
+        wkb = struct.pack("<BII", 1, profile_writers._WKB_MULTILINESTRING, len(parts)) + b"".join(
+            struct.pack("<BII", 1, 2, len(part)) + part.astype("<f8").tobytes() for part in parts)
+    min_x, min_y, max_x, max_y = envelope
+    # Flags 0x03: little-endian, XY envelope
+    return b"GP\x00\x03" + struct.pack("<i4d", srs_id, min_x, max_x, min_y, max_y) + wkb
+
+
+class _GeoPackageCursor(_FileCursor):
+    def __init__(self, backend, filename, table_name, table, fields):
+        super().__init__(table, fields)
+        self.backend = backend
+        self.filename = filename
+        self.table_name = table_name
+        names = ", ".join(f'"{name}"' for name, _, _ in table.schema)
+        self.statement = (f'INSERT INTO "{table_name}" (geom, {names}) '
+                          f'VALUES (?{", ?" * len(table.schema)})')
+        self._lock = None
+        self._connection = None
+
+    def __enter__(self):
+        self._lock = self.backend.Lock(self.filename)
+        self._lock.acquire()
+        self._connection = sqlite3.connect(self.filename, timeout=60, check_same_thread=False)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        connection, self._connection = self._connection, None
+        try:
+            if exc_type is None:
+                if self.table.envelope is not None:
+                    connection.execute("UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ?, "
+                                       "last_change = strftime('%Y-%m-%dT%H:%M:%fZ','now') WHERE table_name = ?",
+                                       (*self.table.envelope, self.table_name))
+                connection.commit()
+            else:
+                connection.rollback()
+        finally:
+            connection.close()
+            self._lock.release()
+        return False
+
+    def Write(self, parts, envelope, values):
+        blob = GeoPackageBlob(parts, envelope, self.table.geometry_type, self.table.spatial_ref)
+        self._connection.execute(self.statement, [blob] + values)
+
+
+class _GeoPackageUpdateCursor:
+    """Update cursor over the given fields of a GeoPackage feature table, committed on exit"""
+
+    def __init__(self, backend, filename, table_name, fields):
+        self.backend = backend
+        self.filename = filename
+        self.table_name = table_name
+        self.fields = list(fields)
+        self._fid = None
+        self._lock = None
+        self._connection = None
+
+    def __enter__(self):
+        self._lock = self.backend.Lock(self.filename)
+        self._lock.acquire()
+        self._connection = sqlite3.connect(self.filename, timeout=60, check_same_thread=False)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        connection, self._connection = self._connection, None
+        try:
+            if exc_type is None:
+                connection.commit()
+            else:
+                connection.rollback()
+        finally:
+            connection.close()
+            self._lock.release()
+        return False
+
+    def __iter__(self):
+        names = ", ".join(f'"{name}"' for name in self.fields)
+        rows = self._connection.execute(f'SELECT fid, {names} FROM "{self.table_name}" ORDER BY fid').fetchall()
+        for row in rows:
+            self._fid = row[0]
+            yield list(row[1:])
+
+    def updateRow(self, values):
+        assignments = ", ".join(f'"{name}" = ?' for name in self.fields)
+        self._connection.execute(f'UPDATE "{self.table_name}" SET {assignments} WHERE fid = ?',
+                                 list(values) + [self._fid])
+
+
+# === FlatBuffers ===
+class FlatBufferBuilder:
+    """Minimal FlatBuffers encoder for the FlatGeobuf header and feature tables
+
+    Tables are laid out front to back: the root offset, then each table preceded by
+    its vtable and followed by the strings, vectors and subtables it references, so
+    every uoffset points forward as the format requires. A field is (index, kind,
+    value) with kind a struct format character for scalars, "string", "table" (value
+    is a field list), "[table]" (a list of field lists) or "[x]" for a vector of
+    scalars x. Fields whose value is None are left out; a fourth item names a scalar
+    or vector whose (first element's) buffer position is recorded in marks, so it can
+    be patched later.
+    """
+
+    _VECTOR_DTYPES = {"B": "<u1", "I": "<u4", "d": "<f8"}
+
+    def __init__(self):
+        self.buffer = bytearray(4)
+        self.marks = {}
+
+    def Finish(self, fields):
+        """Encode the root table and return the finished buffer"""
+        struct.pack_into("<I", self.buffer, 0, self._Table(fields))
+        return bytes(self.buffer)
+
+    def _Align(self, alignment, extra=0):
+        """Pad so that the buffer length plus extra is a multiple of alignment"""
+        self.buffer.extend(bytes(-(len(self.buffer) + extra) % alignment))
+
+    @staticmethod
+    def _InlineSize(kind):
+        return struct.calcsize("<" + kind) if len(kind) == 1 else 4
+
+    def _Table(self, fields):
+        fields = [field for field in fields if field[2] is not None]
+        slots = max((field[0] for field in fields), default=-1) + 1
+
+        # Inline layout: the vtable offset, then each field aligned to its own size
+        layout, size = [], 4
+        for field in sorted(fields, key=lambda field: -self._InlineSize(field[1])):
+            width = self._InlineSize(field[1])
+            size += -size % width
+            layout.append((size, field))
+            size += width
+
+        self._Align(2)
+        vtable = len(self.buffer)
+        self.buffer.extend(struct.pack("<HH", 4 + 2 * slots, size) + bytes(2 * slots))
+        self._Align(8)
+        table = len(self.buffer)
+        self.buffer.extend(bytes(size))
+        struct.pack_into("<i", self.buffer, table, table - vtable)
+
+        for offset, (index, kind, value, *mark) in layout:
+            struct.pack_into("<H", self.buffer, vtable + 4 + 2 * index, offset)
+            if len(kind) == 1:
+                struct.pack_into("<" + kind, self.buffer, table + offset, value)
+                if mark:
+                    self.marks[mark[0]] = table + offset
+        for offset, (index, kind, value, *mark) in layout:
+            if len(kind) > 1:
+                target = self._Reference(kind, value)
+                struct.pack_into("<I", self.buffer, table + offset, target - (table + offset))
+                if mark:
+                    self.marks[mark[0]] = target + 4
+        return table
+
+    def _Reference(self, kind, value):
+        """Append a string, vector or table and return its position"""
+        if kind == "table":
+            return self._Table(value)
+        if kind == "string":
+            data = value.encode("utf-8")
+            self._Align(4)
+            position = len(self.buffer)
+            self.buffer.extend(struct.pack("<I", len(data)) + data + b"\x00")
+            return position
+        if kind == "[table]":
+            self._Align(4)
+            position = len(self.buffer)
+            self.buffer.extend(struct.pack("<I", len(value)) + bytes(4 * len(value)))
+            for number, fields in enumerate(value):
+                slot = position + 4 + 4 * number
+                struct.pack_into("<I", self.buffer, slot, self._Table(fields) - slot)
+            return position
+        elements = np.ascontiguousarray(value, dtype=self._VECTOR_DTYPES[kind[1:-1]])
+        self._Align(max(elements.itemsize, 4), 4)
+        position = len(self.buffer)
+        self.buffer.extend(struct.pack("<I", elements.size) + elements.tobytes())
+        return position
+
+
+# === FlatGeobuf ===
+# Version 3 files without a spatial index: magic bytes, the size-prefixed header, then
+# one size-prefixed feature after another. Polylines are MultiLineStrings whose part
+# ends are stored with every feature.
+_FGB_MAGIC = b"fgb\x03fgb\x00"
+_FGB_GEOMETRY_TYPES = {"POLYLINE": 5, "POLYGON": 3}  # MultiLineString, Polygon
+_FGB_COLUMN_TYPES = {"LONG": (5, "<i"), "SHORT": (3, "<h"), "DOUBLE": (10, "<d"), "FLOAT": (9, "<f"),
+                     "TEXT": (11, None)}  # (ColumnType, value format); strings are length-prefixed UTF-8
+
+
+class FlatGeobufBackend(_FileBackend):
+    """Streams every output into a FlatGeobuf file
+
+    Features are appended as they are inserted and the header's feature count and
+    envelope are patched in place when each cursor closes, so the file is complete
+    between cursors.
+    """
+
+    def CreateFeatureClass(self, path, geometry_type, schema, spatial_ref):
+        code, name, wkt = SpatialReferenceInfo(spatial_ref)
+        crs = [(0, "string", "EPSG"), (1, "i", code), (2, "string", name), (4, "string", wkt or None)] if code else None
+        columns = [
+            [(0, "string", field_name), (1, "B", _FGB_COLUMN_TYPES.get(field_type, (11, None))[0]),
+             (4, "i", length if length else None)]
+            for field_name, field_type, length in schema
+        ]
+        builder = FlatBufferBuilder()
+        header = builder.Finish([
+            (0, "string", os.path.splitext(os.path.basename(path))[0]),
+            (1, "[d]", [np.nan] * 4, "envelope"),
+            (2, "B", _FGB_GEOMETRY_TYPES[geometry_type]),
+            (7, "[table]", columns),
+            (8, "Q", 0, "features_count"),
+            (9, "H", 0),  # No spatial index
+            (10, "table", crs),
+        ])
+        with open(path, "wb") as fgb_file:
+            fgb_file.write(_FGB_MAGIC + struct.pack("<I", len(header)) + header)
+        table = self.tables[path] = _FileTable(geometry_type, schema, spatial_ref)
+        table.count_position = len(_FGB_MAGIC) + 4 + builder.marks["features_count"]
+        table.envelope_position = len(_FGB_MAGIC) + 4 + builder.marks["envelope"]
+
+    def InsertCursor(self, path, fields):
+        return _FlatGeobufCursor(path, self.Table(path), fields)
+
+
+class _FlatGeobufCursor(_FileCursor):
+    def __init__(self, path, table, fields):
+        super().__init__(table, fields)
+        self.path = path
+        self.formats = [_FGB_COLUMN_TYPES.get(field_type, (11, None))[1] for _, field_type, _ in table.schema]
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "r+b")
+        self._file.seek(0, os.SEEK_END)
+        return self
+
+    def __exit__(self, *exc_info):
+        fgb_file, self._file = self._file, None
+        fgb_file.seek(self.table.count_position)
+        fgb_file.write(struct.pack("<Q", self.table.count))
+        if self.table.envelope is not None:
+            fgb_file.seek(self.table.envelope_position)
+            fgb_file.write(struct.pack("<4d", *self.table.envelope))
+        fgb_file.close()
+        return False
+
+    def Properties(self, values):
+        """Column index and value of every non-null attribute"""
+        properties = bytearray()
+        for index, (value_format, value) in enumerate(zip(self.formats, values)):
+            if value is None:
+                continue
+            properties += struct.pack("<H", index)
+            if value_format is None:
+                data = str(value).encode("utf-8")
+                properties += struct.pack("<I", len(data)) + data
+            else:
+                properties += struct.pack(value_format, value)
+        return bytes(properties)
+
+    def Write(self, parts, envelope, values):
+        xy = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        ends = np.cumsum([len(part) for part in parts]) if len(parts) > 1 else None
+        feature = FlatBufferBuilder().Finish([
+            (0, "table", [(0, "[I]", ends), (1, "[d]", xy.ravel())]),
+            (1, "[B]", np.frombuffer(self.Properties(values), dtype=np.uint8)),
+        ])
+        self._file.write(struct.pack("<I", len(feature)) + feature)
@@ -0,0 +1,941 @@
+# === Profile generator library ===
+# Importable API behind PLAN_AND_PROFILE.py. Nothing here reads tool parameters or
+# imports arcpy at import time; arcpy is only loaded by the stages that read input
+# points, write through the arcpy backend or touch the map.
+
+import contextlib
+import dataclasses
+import math
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import profile_estimate
+import profile_formats
+import profile_geometry
+import profile_incremental
+import profile_map
+import profile_metrics
+import profile_writers
+
+# === Per-point overrides ===
+# Optional fields on input_points that replace the matching tool parameter for that
+# bore in batch runs; missing fields and null values fall back to the tool parameter
+OVERRIDE_FIELDS = [
+    ("input_length", float),
+    ("row_number", int),
+    ("depth_type1", str),
+    ("depth_type2", str),
+    ("depth_dimension1", int),
+    ("depth_dimension2", int),
+    ("width_dimension1", int),
+    ("width_dimension2", int),
+    ("title", str),
+    ("bearing", float),
+]
+
+# === Output schema ===
+# (field name, field type, field length) for each output feature class
+LINE_SCHEMA = [
+    ("Line_Type", "TEXT", 50),   # BORE_LINE for the main bore line
+    ("Depth_Type", "TEXT", 50),  # Depth type of lines on the west/east side of the grid
+    ("PolyID", "LONG", None),    # 1 = west, 2 = east
+    ("Role", "TEXT", 20),        # Kernel role of each line
+    ("ProfileID", "LONG", None), # OBJECTID of the input point
+]
+POLYGON_SCHEMA = [
+    ("Depth_Type", "TEXT", 50),
+    ("PolyID", "LONG", None),
+    ("Title", "TEXT", 100),
+    ("ProfileID", "LONG", None),
+]
+CONNECTOR_SCHEMA = [
+    ("Line_Type", "TEXT", 50),
+    ("ProfileID", "LONG", None),
+]
+CELL_SCHEMA = [
+    ("RowIndex", "LONG", None),   # 1 for the top row, counting down
+    ("Top", "DOUBLE", None),      # Top of the row relative to the bore line
+    ("Bottom", "DOUBLE", None),   # Bottom of the row relative to the bore line
+    ("Side", "TEXT", 10),         # ABOVE or BELOW the bore line
+    ("ProfileID", "LONG", None),
+]
+LINE_FIELDS = [name for name, _, _ in LINE_SCHEMA]
+POLYGON_FIELDS = [name for name, _, _ in POLYGON_SCHEMA]
+CONNECTOR_FIELDS = [name for name, _, _ in CONNECTOR_SCHEMA]
+CELL_FIELDS = [name for name, _, _ in CELL_SCHEMA]
+
+# grid_cells is optional and only written when its path is set
+OUTPUTS = ["output_lines", "depth_polygons", "bore_line", "grid_cells"]
+OUTPUT_SCHEMAS = {
+    "output_lines": ("POLYLINE", LINE_SCHEMA),
+    "depth_polygons": ("POLYGON", POLYGON_SCHEMA),
+    "bore_line": ("POLYLINE", CONNECTOR_SCHEMA),
+    "grid_cells": ("POLYGON", CELL_SCHEMA),
+}
+
+# In-memory workspace used to stage the outputs before a bulk copy to their final paths
+MEMORY_WORKSPACE = "memory"
+
+# === Concurrency ===
+CONCURRENCY_THREADS = "THREADS"      # One thread per output, sharing this process's arcpy
+CONCURRENCY_PROCESSES = "PROCESSES"  # One process per output writing to its own scratch geodatabase
+CONCURRENCY_MODES = ("", CONCURRENCY_THREADS, CONCURRENCY_PROCESSES)
+
+# === Tool parameters ===
+# ModelBuilder parameter order and text conversion; optional parameters left empty keep
+# their ProfileParameters default
+TOOL_PARAMETERS = [
+    ("input_points", str),        # 0  Input Point Feature Class
+    ("output_lines", str),        # 1  Output Line Feature Class
+    ("bore_line", str),           # 2  Bore Line Feature Class
+    ("depth_polygons", str),      # 3  Depth Polygons Feature Class
+    ("input_length", float),      # 4  Input Integer Length
+    ("row_number", int),          # 5  Number of rows for grid
+    ("depth_type1", str),         # 6  Depth Type #1 String
+    ("depth_type2", str),         # 7  Depth Type #2 String
+    ("depth_dimension1", int),    # 8  Depth Dimension #1 Integer
+    ("depth_dimension2", int),    # 9  Depth Dimension #2 Integer
+    ("width_dimension1", int),    # 10 Width Dimension #1 Integer (East)
+    ("width_dimension2", int),    # 11 Width Dimension #2 Integer (West)
+    ("title", str),               # 12 Title String
+    ("per_row_verticals", bool),  # 13 Optional Boolean - one vertical per grid row
+    ("write_method", str),        # 14 Optional String - CURSOR/WKB for all outputs or output=method;...
+    ("metrics_log", str),         # 15 Optional File - JSON-lines log of per-stage metrics
+    ("stage_in_memory", bool),    # 16 Optional Boolean - build outputs in memory, then copy
+    ("fingerprint_file", str),    # 17 Optional File - JSON state enabling incremental regeneration
+    ("concurrency", str),         # 18 Optional String - THREADS or PROCESSES to write the outputs in parallel
+    ("chunk_size", int),          # 19 Optional Integer - stream features to the writers in chunks of this size
+    ("multipart", bool),          # 20 Optional Boolean - one multipart line per group of lines
+    ("bearing", float),           # 21 Optional Double - azimuth of the bore axis, degrees clockwise from north
+    ("dry_run", bool),            # 22 Optional Boolean - report the estimated layout and write nothing
+    ("edit_batch_size", int),     # 23 Optional Integer - write in edit sessions, saving every this many profiles
+    ("grid_cells", str),          # 24 Optional Output Polygon Feature Class - one polygon per grid row
+    ("output_format", str),       # 25 Optional String - GEOJSON, GPKG or FLATGEOBUF instead of geodatabase outputs
+    ("add_to_map", bool),         # 26 Optional Boolean - show the outputs in the active map (default on)
+    ("layer_template", str),      # 27 Optional File - .lyrx whose layers symbolize the outputs added to the map
+]
+REQUIRED_TOOL_PARAMETERS = 13
+
+# === Limits ===
+# Inputs beyond these are rejected before any output is created
+MAX_ROW_NUMBER = 1_000_000    # Grid rows per profile
+MAX_FEATURES = 50_000_000     # Features across every output of a run
+
+
+class ProfileError(Exception):
+    """Raised when a profile cannot be generated from the given parameters"""
+
+
+@dataclass
+class ProfileParameters:
+    """Everything needed to generate profiles; mirrors the 13 tool parameters plus options
+
+    Points come from the input_points feature class, or from points given directly as
+    (x, y) or (x, y, overrides) tuples, in which case input_points is never read and
+    spatial_reference is used for the outputs.
+    """
+
+    input_points: str = ""
+    output_lines: str = ""
+    bore_line: str = ""
+    depth_polygons: str = ""
+    input_length: float = 0.0
+    row_number: int = 0
+    depth_type1: str = ""
+    depth_type2: str = ""
+    depth_dimension1: int = 0
+    depth_dimension2: int = 0
+    width_dimension1: int = 0
+    width_dimension2: int = 0
+    title: str = ""
+
+    # === Options ===
+    per_row_verticals: bool = False  # One 1ft vertical per grid row instead of one rail per side
+    write_method: str = ""           # CURSOR/WKB for all outputs or output=method;...
+    add_to_map: bool = True          # Add the outputs to the current ArcGIS Pro map
+    layer_template: str = ""         # .lyrx whose layers, matched by name, symbolize the outputs added to the map
+    metrics_log: str = ""            # Append per-stage metrics for each run to this JSON-lines file
+    stage_in_memory: bool = False    # Build the outputs in the memory workspace, then copy each once
+    fingerprint_file: str = ""       # Only regenerate outputs whose inputs changed since the fingerprints saved here
+    concurrency: str = ""            # THREADS or PROCESSES to write the outputs in parallel, sequential when empty
+    chunk_size: int = 0              # Stream features lazily in writes of this many, 0 writes a profile at a time
+    multipart: bool = False          # Write each group of lines of a profile as one multipart feature
+    bearing: Optional[float] = None  # Azimuth of the bore axis (west end to east end); None keeps it east-west
+    dry_run: bool = False            # Validate and estimate the layout without creating or writing anything
+    edit_batch_size: int = 0         # Write in edit sessions with one saved operation per this many profiles
+    grid_cells: str = ""             # Polygon feature class receiving one polygon per grid row
+    output_format: str = ""          # GEOJSON, GPKG or FLATGEOBUF; inferred from the output_lines path when empty
+
+    # === Library use ===
+    points: Optional[Sequence[Sequence[Any]]] = None
+    spatial_reference: Any = None
+    backend: Any = None    # Writer backend, profile_writers.ArcpyBackend when None
+    reporter: Any = None   # Object with AddMessage/AddWarning (e.g. the arcpy module)
+
+
+@dataclass
+class ProfileResult:
+    """Outputs and run statistics returned by generate_profile"""
+
+    output_lines: str
+    depth_polygons: str
+    bore_line: str
+    grid_cells: str = ""
+    profile_count: int = 0
+    rows: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    messages: List[str] = field(default_factory=list)
+    metrics: Any = None  # profile_metrics.ProfileMetrics for the run
+    actions: Dict[str, str] = field(default_factory=dict)  # profile_incremental action per output
+    estimate: Dict[str, Any] = field(default_factory=dict)  # profile_estimate.EstimateLayout for the run
+
+
+def ParametersFromText(values, **options):
+    """Build ProfileParameters from tool parameter text values in ModelBuilder order"""
+    converted = {}
+    for index, (name, convert) in enumerate(TOOL_PARAMETERS):
+        text = str(values[index]) if index < len(values) and values[index] is not None else ""
+        if index >= REQUIRED_TOOL_PARAMETERS and text == "":
+            continue
+        converted[name] = text.lower() == "true" if convert is bool else convert(text)
+    converted.update(options)
+    return ProfileParameters(**converted)
+
+
+class ProfileOrigin:
+    """One input point and its resolved profile parameters, read once and shared by every stage"""
+
+    __slots__ = (
+        "profile_id", "x", "y", "input_length", "row_number", "depth_type1", "depth_type2",
+        "depth_dimension1", "depth_dimension2", "width_dimension1", "width_dimension2",
+        "title", "bearing", "half_length"
+    )
+
+    def __init__(self, profile_id, x, y, params, overrides):
+        self.profile_id = profile_id
+        self.x = x
+        self.y = y
+
+        # Tool parameters, replaced by any non-null override value for this point
+        for name, convert in OVERRIDE_FIELDS:
+            value = overrides.get(name)
+            if value is not None and value != "":
+                try:
+                    setattr(self, name, convert(value))
+                except (TypeError, ValueError):
+                    raise ProfileError(f"Profile {profile_id}: {name} override {value!r} "
+                                       f"is not a valid {convert.__name__}") from None
+            else:
+                setattr(self, name, getattr(params, name))
+
+        # === Derived value ===
+        self.half_length = self.input_length / 2.0
+
+
+class ProfileRun:
+    """State shared by the stages of one generate_profile call"""
+
+    __slots__ = (
+        "params", "result", "metrics", "backend", "write_methods", "origins", "spatial_ref", "paths",
+        "outputs", "actions", "fingerprints"
+    )
+
+    def __init__(self, params, result, metrics, backend, write_methods):
+        self.params = params
+        self.result = result
+        self.metrics = metrics
+        self.backend = backend
+        self.write_methods = write_methods
+        self.origins = []
+        self.spatial_ref = None
+        self.paths = OutputPaths(params)
+        self.outputs = RequestedOutputs(params)
+        self.actions = {output: profile_incremental.ACTION_REBUILD for output in self.outputs}
+        self.fingerprints = {}
+
+
+def OutputFormat(params):
+    """File format of the outputs, or profile_formats.FORMAT_GEODATABASE for arcpy outputs"""
+    return params.output_format.upper() or profile_formats.PathFormat(params.output_lines)
+
+
+def Staged(params):
+    """True when the outputs are built in the memory workspace and copied into place"""
+    # Worker processes cannot share a memory workspace; they stage in scratch geodatabases instead
+    return params.stage_in_memory and params.concurrency.upper() != CONCURRENCY_PROCESSES
+
+
+def RequestedOutputs(params):
+    """OUTPUTS with a path set; the optional grid_cells output is skipped when empty"""
+    return [output for output in OUTPUTS if getattr(params, output)]
+
+
+def OutputPaths(params):
+    """Path each output is written to: its final path, or a memory workspace path when staging"""
+    if not Staged(params):
+        return {output: getattr(params, output) for output in OUTPUTS}
+    return {output: os.path.join(MEMORY_WORKSPACE, f"profile_{output}") for output in OUTPUTS}
+
+
+def AddMessage(run, message):
+    """Record a message on the result and forward it to the reporter"""
+    run.result.messages.append(message)
+    if run.params.reporter is not None:
+        run.params.reporter.AddMessage(message)
+
+
+def AddWarning(run, message):
+    """Record a warning on the result and forward it to the reporter"""
+    run.result.messages.append(f"WARNING: {message}")
+    if run.params.reporter is not None:
+        run.params.reporter.AddWarning(message)
+
+
+def LoadProfileOrigins(params, metrics=profile_metrics.NULL_METRICS):
+    """Read the profile points once, returning their ProfileOrigin records and spatial reference"""
+    if params.points is not None:
+        origins = []
+        for profile_id, point in enumerate(params.points, start=1):
+            overrides = {name.lower(): value for name, value in (point[2] if len(point) > 2 else {}).items()}
+            origins.append(ProfileOrigin(profile_id, point[0], point[1], params, overrides))
+        return origins, params.spatial_reference
+
+    import arcpy
+
+    # A single Describe provides both the spatial reference and the override fields
+    desc = arcpy.Describe(params.input_points)
+    existing = {field.name.lower(): field.name for field in desc.fields}
+    fields = [existing[name] for name, _ in OVERRIDE_FIELDS if name in existing]
+
+    origins = []
+    with arcpy.da.SearchCursor(params.input_points, ["OID@", "SHAPE@XY"] + fields) as search_cursor:
+        metrics.Count("cursors")
+        for row in search_cursor:
+            x, y = row[1]
+            overrides = {name.lower(): value for name, value in zip(fields, row[2:])}
+            origins.append(ProfileOrigin(row[0], x, y, params, overrides))
+
+    return origins, params.spatial_reference or desc.spatialReference
+
+
+# === Validation ===
+def LayoutProblems(source):
+    """(parameter, message) for each layout value of ProfileParameters or a ProfileOrigin that cannot make a profile"""
+    problems = []
+    if not 0 < source.input_length < math.inf:
+        problems.append(("input_length", f"input_length must be a finite length greater than 0 "
+                                         f"(got {source.input_length})"))
+    if source.row_number < 0:
+        problems.append(("row_number", f"row_number cannot be negative (got {source.row_number})"))
+    elif source.row_number > MAX_ROW_NUMBER:
+        problems.append(("row_number", f"row_number {source.row_number:,} exceeds the maximum of {MAX_ROW_NUMBER:,}"))
+    for name in ("depth_dimension1", "depth_dimension2", "width_dimension1", "width_dimension2"):
+        value = getattr(source, name)
+        if not value > 0:
+            problems.append((name, f"{name} must be greater than 0 (got {value})"))
+    if source.bearing is not None and not math.isfinite(source.bearing):
+        problems.append(("bearing", f"bearing must be a finite angle (got {source.bearing})"))
+    return problems
+
+
+def ValidateParameters(params):
+    """(parameter, message) for every problem found in params without reading or writing any data"""
+    problems = LayoutProblems(params)
+    if params.concurrency.upper() not in CONCURRENCY_MODES:
+        problems.append(("concurrency", f"Unknown concurrency '{params.concurrency}', expected THREADS or PROCESSES"))
+    elif params.concurrency.upper() == CONCURRENCY_PROCESSES:
+        # Worker processes write through their own arcpy and receive the spatial reference as text
+        if params.backend is not None:
+            problems.append(("concurrency", "PROCESSES concurrency writes through arcpy and cannot use a custom backend"))
+        if params.points is not None and params.spatial_reference is None:
+            problems.append(("concurrency", "PROCESSES concurrency needs a spatial_reference for the given points"))
+    if params.chunk_size < 0:
+        problems.append(("chunk_size", f"chunk_size cannot be negative (got {params.chunk_size})"))
+    if params.edit_batch_size < 0:
+        problems.append(("edit_batch_size", f"edit_batch_size cannot be negative (got {params.edit_batch_size})"))
+    elif params.edit_batch_size and params.concurrency:
+        problems.append(("edit_batch_size", "edit_batch_size writes the outputs sequentially and cannot use concurrency"))
+    elif params.edit_batch_size and params.stage_in_memory:
+        problems.append(("edit_batch_size", "edit_batch_size edits the outputs in place and cannot use stage_in_memory"))
+    output_format = OutputFormat(params)
+    if output_format not in profile_formats.FORMATS:
+        problems.append(("output_format", f"Unknown output_format '{params.output_format}', "
+                                          f"expected GEOJSON, GPKG or FLATGEOBUF"))
+    elif output_format:
+        # File outputs are written directly by this process, outside any geodatabase
+        for name, label, enabled in (
+                ("stage_in_memory", "stage_in_memory", params.stage_in_memory),
+                ("edit_batch_size", "edit_batch_size", params.edit_batch_size),
+                ("concurrency", "PROCESSES concurrency", params.concurrency.upper() == CONCURRENCY_PROCESSES)):
+            if enabled:
+                problems.append((name, f"{label} is not supported with {output_format} outputs"))
+    try:
+        profile_writers.ParseWriteMethods(params.write_method, OUTPUTS)
+    except ValueError as e:
+        problems.append(("write_method", str(e)))
+    return problems
+
+
+def ValidateOrigins(run):
+    """Raise ProfileError for per-point override values that cannot make a profile"""
+    problems = [f"Profile {origin.profile_id}: {message}"
+                for origin in run.origins for _, message in LayoutProblems(origin)]
+    if problems:
+        more = f" (and {len(problems) - 10} more)" if len(problems) > 10 else ""
+        raise ProfileError("; ".join(problems[:10]) + more)
+
+
+def ValidateEstimate(run):
+    """Raise ProfileError when the estimated run writes more than MAX_FEATURES features"""
+    if run.result.estimate["features"] > MAX_FEATURES:
+        raise ProfileError(f"The profiles would write {run.result.estimate['features']:,} features, "
+                           f"more than the maximum of {MAX_FEATURES:,}; reduce row_number or the number of points")
+
+
+def EstimateRun(run):
+    """Analytical layout estimate for writing every origin to the final output paths"""
+    params = run.params
+    return profile_estimate.EstimateLayout(
+        run.origins, {output: getattr(params, output) for output in run.outputs}, run.write_methods,
+        params.per_row_verticals, params.multipart, params.chunk_size, Staged(params))
+
+
+def ProfileValues(profile_id, values):
+    """Append the ProfileID to each feature's attribute values"""
+    return [list(feature_values) + [profile_id] for feature_values in values]
+
+
+def DepthTypes(origin):
+    """Depth_Type of the west (PolyID 1) and east (PolyID 2) sides of a profile"""
+    return {
+        profile_geometry.POLY_ID_WEST: origin.depth_type2,
+        profile_geometry.POLY_ID_EAST: origin.depth_type1,
+    }
+
+
+def LineValues(lines, origin):
+    """Tag output_lines features with Line_Type, Depth_Type, PolyID, Role and ProfileID from their kernel role"""
+    depth_types = DepthTypes(origin)
+    values = []
+    for role, poly_id in lines.attributes.tolist():
+        line_type = "BORE_LINE" if role == profile_geometry.ROLE_BORE_LINE else None
+        depth_type = depth_types.get(poly_id)
+        values.append([line_type, depth_type, poly_id if depth_type is not None else None,
+                       profile_geometry.ROLE_NAMES[role], origin.profile_id])
+    return values
+
+
+def PolygonValues(origin):
+    """Depth_Type, PolyID and Title of the west, east and background polygons of a profile"""
+    return [
+        [origin.depth_type2, 1, None],
+        [origin.depth_type1, 2, None],
+        ["BACKGROUND", 0, origin.title]
+    ]
+
+
+def OriginTemplate(origin, params):
+    """Cached origin-relative layout shared by every profile with the same dimensions"""
+    return profile_geometry.ProfileTemplate(
+        origin.input_length, origin.row_number, origin.depth_dimension1, origin.depth_dimension2,
+        origin.width_dimension1, origin.width_dimension2, params.per_row_verticals, params.multipart,
+        bool(params.grid_cells)
+    )
+
+
+def RebuiltOutputs(run):
+    """Outputs recreated and written from scratch in this run"""
+    return [output for output in run.outputs if run.actions[output] == profile_incremental.ACTION_REBUILD]
+
+
+def CreateOutputs(run):
+    """Create the output feature classes being rebuilt"""
+    # output_lines carries Line_Type, Depth_Type, PolyID, Role and ProfileID, depth_polygons
+    # Depth_Type, PolyID, Title and ProfileID, bore_line Line_Type and ProfileID, and
+    # grid_cells RowIndex, Top, Bottom, Side and ProfileID
+    for output in RebuiltOutputs(run):
+        geometry_type, schema = OUTPUT_SCHEMAS[output]
+        run.backend.CreateFeatureClass(run.paths[output], geometry_type, schema, run.spatial_ref)
+
+
+def OpenOutputWriter(run, output, geometry_type, fields):
+    """Open the writer selected for output (one of OUTPUTS)"""
+    return profile_writers.OpenWriter(run.write_methods[output], run.paths[output], geometry_type,
+                                      fields, run.spatial_ref, run.backend, run.metrics)
+
+
+# === Feature streams ===
+# Each output is produced as a stream of (features, attribute values) pieces. By default
+# every profile is one piece placed from the cached template; with chunk_size the pieces
+# are computed lazily, bypassing the template cache, and written in fixed-size chunks.
+# Pieces are laid out in the profile's local frame (bore axis along +x, centered on
+# (0, 0)) and mapped to the map by PlaceAtOrigin.
+def Streaming(run):
+    return run.params.chunk_size > 0
+
+
+def PlaceAtOrigin(features, origin):
+    """Map local-frame features to the origin's point and bearing"""
+    return profile_geometry.PlaceFeatures(features, origin.x, origin.y, origin.bearing)
+
+
+def LinePieces(run, origins):
+    """Tagged output_lines features of each origin's profile"""
+    for origin in origins:
+        # Bore line, 1ft ticks, combined dimension line and the row grid above and
+        # below the bore line
+        if Streaming(run):
+            for lines in profile_geometry.ProfileLineChunks(
+                    0.0, 0.0, origin.input_length, origin.row_number, origin.width_dimension1,
+                    origin.width_dimension2, run.params.per_row_verticals, run.params.chunk_size):
+                if run.params.multipart:
+                    lines = profile_geometry.MergeParts(lines)
+                lines = PlaceAtOrigin(lines, origin)
+                yield lines, LineValues(lines, origin)
+        else:
+            lines = PlaceAtOrigin(OriginTemplate(origin, run.params).lines, origin)
+            yield lines, LineValues(lines, origin)
+
+
+def PolygonPieces(run, origins):
+    """Depth and background polygons of each origin's profile"""
+    for origin in origins:
+        # West (PolyID = 1) and east (PolyID = 2) depth polygons followed by the
+        # background polygon (pink area) covering the entire grid area
+        if Streaming(run):
+            polygons = profile_geometry.PolygonCoordinates(
+                0.0, 0.0, origin.half_length, origin.row_number, origin.depth_dimension1,
+                origin.depth_dimension2, origin.width_dimension1, origin.width_dimension2)
+        else:
+            polygons = OriginTemplate(origin, run.params).polygons
+        polygons = PlaceAtOrigin(polygons, origin)
+        yield polygons, ProfileValues(origin.profile_id, PolygonValues(origin))
+
+
+def ConnectorPieces(run, origins):
+    """Bore connection line of each origin's profile"""
+    for origin in origins:
+        # Connecting line from west polygon bottom right to east polygon bottom left
+        if Streaming(run):
+            line = profile_geometry.BoreConnectorCoordinates(
+                0.0, 0.0, origin.half_length, origin.row_number,
+                origin.depth_dimension1, origin.depth_dimension2)
+        else:
+            line = OriginTemplate(origin, run.params).connector
+        line = PlaceAtOrigin(line, origin)
+        yield line, ProfileValues(origin.profile_id, [["BORE_CONNECTION"]])
+
+
+def CellValues(cells, origin):
+    """RowIndex, Top, Bottom, Side and ProfileID of local-frame grid cells, read from each ring's top edge"""
+    rows_above, _ = profile_geometry.SplitRows(origin.row_number)
+    values = []
+    for top in cells.coords[cells.offsets[:-1], 1].tolist():
+        values.append([rows_above - int(top) + 1, top, top - 1, "ABOVE" if top > 0 else "BELOW", origin.profile_id])
+    return values
+
+
+def CellPieces(run, origins):
+    """Grid row polygons of each origin's profile"""
+    for origin in origins:
+        # One polygon per row, spanning the background polygon, from the top row down
+        if Streaming(run):
+            for start in range(0, origin.row_number, run.params.chunk_size):
+                cells = profile_geometry.GridCellCoordinates(
+                    0.0, 0.0, origin.half_length, origin.row_number, origin.width_dimension1,
+                    origin.width_dimension2, start, min(start + run.params.chunk_size, origin.row_number))
+                yield PlaceAtOrigin(cells, origin), CellValues(cells, origin)
+        else:
+            cells = OriginTemplate(origin, run.params).cells
+            yield PlaceAtOrigin(cells, origin), CellValues(cells, origin)
+
+
+def WritePieces(run, writer, pieces):
+    """Write each piece, or batch the pieces into writes of at most chunk_size parts when streaming"""
+    if not Streaming(run):
+        for features, values in pieces:
+            writer.Write(features, values)
+        return
+
+    # Chunks are measured in parts, so multipart features count as every line they hold
+    chunk, chunk_values, chunk_parts = [], [], 0
+    for features, values in pieces:
+        if chunk and chunk_parts + features.part_count > run.params.chunk_size:
+            writer.Write(profile_geometry.Concatenate(chunk), chunk_values)
+            chunk, chunk_values, chunk_parts = [], [], 0
+        chunk.append(features)
+        chunk_values.extend(values)
+        chunk_parts += features.part_count
+    if chunk:
+        writer.Write(profile_geometry.Concatenate(chunk), chunk_values)
+
+
+# === Edit sessions ===
+# With edit_batch_size every output is written inside an arcpy.da.Editor session: one
+# edit operation, committed by a save, per batch of profiles. A failure rolls back the
+# unsaved batch, and generate_profile then deletes the partially written outputs.
+def EditOutput(run, path):
+    """Edit session for writes to path when edit_batch_size is set, otherwise a no-op context"""
+    if not run.params.edit_batch_size:
+        return contextlib.nullcontext()
+    return profile_writers.EditSession(profile_writers.EditWorkspace(path), run.backend.IsVersioned(path),
+                                       run.backend, run.metrics)
+
+
+def WriteProfiles(run, writer, pieces):
+    """Write pieces(run, origins) of every profile, saving an edit operation every edit_batch_size profiles"""
+    batch_size = run.params.edit_batch_size or len(run.origins)
+    with EditOutput(run, writer.path) as session:
+        for start in range(0, len(run.origins), batch_size):
+            if start:
+                session.Save()
+            # The insert cursor is reopened for every operation, so none stays open across a save
+            with writer:
+                WritePieces(run, writer, pieces(run, run.origins[start:start + batch_size]))
+
+
+def LineGenerator(run):
+    """Write every profile's lines into output_lines in a single tagged insert pass"""
+    # Every line is tagged as it is inserted, so output_lines is written in one pass
+    # with no follow-up classification, depth tagging or cleanup scans
+    writer = OpenOutputWriter(run, "output_lines", "POLYLINE", LINE_FIELDS)
+    WriteProfiles(run, writer, LinePieces)
+    return writer
+
+
+def PolygonConnector(run):
+    """Connect corner polylines from groups 1 and 2 to create polygons in depth_polygons feature class"""
+    # Create polygon writer for depth polygons shared by every profile
+    writer = OpenOutputWriter(run, "depth_polygons", "POLYGON", POLYGON_FIELDS)
+    WriteProfiles(run, writer, PolygonPieces)
+    return writer
+
+
+def BoreConnector(run):
+    """Create a line connecting the bottom right corner of polygon 1 to the bottom left corner of polygon 2"""
+    # Create the connecting lines from west polygon bottom right to east polygon bottom left
+    writer = OpenOutputWriter(run, "bore_line", "POLYLINE", CONNECTOR_FIELDS)
+    WriteProfiles(run, writer, ConnectorPieces)
+    return writer
+
+
+def GridCellGenerator(run):
+    """Write every grid row as a polygon into grid_cells, replacing a Feature To Polygon pass over output_lines"""
+    writer = OpenOutputWriter(run, "grid_cells", "POLYGON", CELL_FIELDS)
+    WriteProfiles(run, writer, CellPieces)
+    return writer
+
+
+# Stage name and writer function for each output
+OUTPUT_GENERATORS = {
+    "output_lines": ("grid", LineGenerator),         # Bore line, ticks, combined line and row grid
+    "depth_polygons": ("polygons", PolygonConnector), # Depth polygons from the depth rectangle corners
+    "bore_line": ("connector", BoreConnector),        # Bore connection line between the polygons
+    "grid_cells": ("cells", GridCellGenerator),       # Row polygons covering the background polygon
+}
+
+
+def WriteOutput(run, output):
+    """Write one rebuilt output in its own stage; returns (rows, writer summary)"""
+    stage, generator = OUTPUT_GENERATORS[output]
+    with run.metrics.Stage(stage):
+        writer = generator(run)
+    return writer.rows, writer.Summary()
+
+
+def WriteOutputsConcurrently(run, outputs):
+    """Write the rebuilt outputs in parallel threads or processes; returns {output: (rows, summary)}"""
+    # The layout templates are computed once up front and shared by every writer
+    if not Streaming(run):
+        for origin in run.origins:
+            OriginTemplate(origin, run.params)
+
+    if run.params.concurrency.upper() == CONCURRENCY_PROCESSES:
+        return WriteOutputsInProcesses(run, outputs)
+    with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+        futures = {output: executor.submit(WriteOutput, run, output) for output in outputs}
+    return {output: future.result() for output, future in futures.items()}
+
+
+def ProcessContext():
+    """spawn context for worker processes; inside ArcGIS Pro they run the bundled python, not ArcGISPro.exe"""
+    context = multiprocessing.get_context("spawn")
+    if profile_map.InsideArcGISPro():
+        context.set_executable(os.path.join(sys.exec_prefix, "pythonw.exe"))
+    return context
+
+
+def WriteOutputsInProcesses(run, outputs):
+    """Write each output into its own scratch file geodatabase in a worker process, then copy it into place"""
+    # Worker processes get picklable copies: parameters without in-process objects and
+    # the spatial reference as its string form
+    params = dataclasses.replace(run.params, reporter=None, spatial_reference=None, points=None)
+    spatial_ref = run.spatial_ref.exportToString()
+    scratch = tempfile.mkdtemp(prefix="profile_")
+    try:
+        with ProcessPoolExecutor(max_workers=len(outputs), mp_context=ProcessContext()) as executor:
+            futures = {
+                output: executor.submit(WriteOutputProcess, output, params, run.origins, spatial_ref,
+                                        scratch, run.write_methods)
+                for output in outputs
+            }
+            results = {output: future.result() for output, future in futures.items()}
+
+        # === Finalize ===
+        # Every output is complete before any is copied to its final path
+        written = {}
+        with run.metrics.Stage("copy"):
+            for output, (path, rows, summary, stages) in results.items():
+                run.backend.CopyFeatures(path, run.paths[output])
+                run.metrics.Merge(stages)
+                written[output] = (rows, summary)
+        return written
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def WriteOutputProcess(output, params, origins, spatial_ref_text, scratch, write_methods):
+    """Process pool entry point: write one output into a new file geodatabase under scratch"""
+    import arcpy
+    spatial_ref = arcpy.SpatialReference()
+    spatial_ref.loadFromString(spatial_ref_text)
+    workspace = arcpy.CreateFileGDB_management(scratch, output).getOutput(0)
+
+    run = ProfileRun(params, ProfileResult(params.output_lines, params.depth_polygons, params.bore_line, params.grid_cells),
+                     profile_metrics.ProfileMetrics(), profile_writers.ArcpyBackend(schema_templates=False),
+                     write_methods)
+    run.origins, run.spatial_ref = origins, spatial_ref
+    run.paths = {output: os.path.join(workspace, output)}
+    geometry_type, schema = OUTPUT_SCHEMAS[output]
+    run.backend.CreateFeatureClass(run.paths[output], geometry_type, schema, spatial_ref)
+    rows, summary = WriteOutput(run, output)
+    return run.paths[output], rows, summary, list(run.metrics.AsDict().values())
+
+
+def CopyStagedOutputs(run):
+    """Copy each staged output to its final path in one bulk operation"""
+    for output in RebuiltOutputs(run):
+        run.backend.CopyFeatures(run.paths[output], getattr(run.params, output))
+
+
+def DeleteOutputs(run, outputs):
+    """Delete outputs at the paths they were written to"""
+    for output in outputs:
+        run.backend.Delete(run.paths[output])
+
+
+def DeleteStagedOutputs(run):
+    """Release the memory workspace copies of the outputs"""
+    DeleteOutputs(run, RebuiltOutputs(run))
+
+
+# === Incremental regeneration ===
+def LineAttributeValues(origin, poly_id):
+    """Depth_Type of an output_lines row"""
+    return [DepthTypes(origin).get(poly_id)]
+
+
+def PolygonAttributeValues(origin, poly_id):
+    """Depth_Type and Title of a depth_polygons row"""
+    depth_type, _, title = next(values for values in PolygonValues(origin) if values[1] == poly_id)
+    return [depth_type, title]
+
+
+# Attribute fields rewritten in place, and their current values from (origin, PolyID)
+ATTRIBUTE_UPDATES = {
+    "output_lines": (["Depth_Type"], LineAttributeValues),
+    "depth_polygons": (["Depth_Type", "Title"], PolygonAttributeValues),
+}
+
+
+def PlanOutputs(run):
+    """Compare each output's fingerprint with the saved state and choose its action"""
+    params = run.params
+    run.fingerprints = {
+        output: profile_incremental.OutputFingerprint(output, run.origins, run.spatial_ref,
+                                                      params.per_row_verticals, params.multipart,
+                                                      params.chunk_size)
+        for output in run.outputs
+    }
+    state = profile_incremental.ReadState(params.fingerprint_file)
+    for output in run.outputs:
+        path = getattr(params, output)
+        run.actions[output] = profile_incremental.PlanAction(run.fingerprints[output], state.get(path),
+                                                             run.backend.Exists(path))
+        # Backends that can only append rebuild outputs whose labels changed
+        if run.actions[output] == profile_incremental.ACTION_UPDATE and not hasattr(run.backend, "UpdateCursor"):
+            run.actions[output] = profile_incremental.ACTION_REBUILD
+
+
+def SaveFingerprints(run, outputs):
+    """Record the fingerprints of outputs and forget the others, so interrupted outputs are rebuilt"""
+    state = profile_incremental.ReadState(run.params.fingerprint_file)
+    for output in run.outputs:
+        path = getattr(run.params, output)
+        if output in outputs:
+            state[path] = run.fingerprints[output]
+        else:
+            state.pop(path, None)
+    profile_incremental.WriteState(run.params.fingerprint_file, state)
+
+
+def UpdateAttributes(run, output):
+    """Rewrite the attribute values of an output in place; returns the number of rows changed"""
+    fields, current_values = ATTRIBUTE_UPDATES[output]
+    origins = {origin.profile_id: origin for origin in run.origins}
+    updated = 0
+    path = getattr(run.params, output)
+    with EditOutput(run, path), run.backend.UpdateCursor(path, ["ProfileID", "PolyID"] + fields) as cursor:
+        run.metrics.Count("cursors")
+        for row in cursor:
+            values = current_values(origins[row[0]], row[1])
+            if list(row[2:]) != values:
+                cursor.updateRow(list(row[:2]) + values)
+                updated += 1
+    run.metrics.Count("updated", updated)
+    return updated
+
+
+def AddToMap(run):
+    """Show the outputs in the active map, reusing and refreshing layers added by earlier runs"""
+    params = run.params
+    layers = [(name, getattr(params, parameter)) for parameter, name in profile_map.MAP_LAYERS
+              if getattr(params, parameter)]
+    refresh = [getattr(params, output) for output in RebuiltOutputs(run)]
+    try:
+        messages, warnings = profile_map.InjectLayers(layers, refresh, params.layer_template)
+    except Exception as e:
+        AddWarning(run, f"Could not add feature classes to map: {str(e)}")
+        return
+    for message in messages:
+        AddMessage(run, message)
+    for warning in warnings:
+        AddWarning(run, warning)
+
+
+def generate_profile(params):
+    """Generate the profile lines, depth polygons and bore connectors for every profile point"""
+    # === Validate parameters ===
+    # Pathological values are rejected before any data is read or written
+    problems = ValidateParameters(params)
+    if problems:
+        raise ProfileError("; ".join(message for _, message in problems))
+
+    result = ProfileResult(params.output_lines, params.depth_polygons, params.bore_line, params.grid_cells)
+    run = ProfileRun(params, result, profile_metrics.ProfileMetrics(),
+                     params.backend or profile_formats.FormatBackend(OutputFormat(params))
+                     or profile_writers.ArcpyBackend(),
+                     profile_writers.ParseWriteMethods(params.write_method, OUTPUTS))
+    result.metrics = run.metrics
+    concurrency = params.concurrency.upper()
+
+    # === Load input points ===
+    # The points are read once; every stage works from the same origin records
+    with run.metrics.Stage("load"):
+        run.origins, run.spatial_ref = LoadProfileOrigins(params, run.metrics)
+
+    # === Validate input points count ===
+    if not run.origins:
+        raise ProfileError("The Profile Point feature class does not contain any points.")
+    result.profile_count = len(run.origins)
+
+    # === Estimate layout ===
+    # Counts and extents are computed analytically, so overrides and the run size are
+    # checked before any output is created
+    with run.metrics.Stage("estimate"):
+        ValidateOrigins(run)
+        result.estimate = EstimateRun(run)
+        ValidateEstimate(run)
+    if params.dry_run:
+        for line in profile_estimate.EstimateSummary(result.estimate):
+            AddMessage(run, line)
+        result.elapsed = run.metrics.elapsed
+        AddMessage(run, f"Dry run: nothing written ({result.elapsed * 1000:.1f} ms)")
+        return result
+
+    # === Plan incremental regeneration ===
+    # Without a fingerprint file every output is rebuilt
+    if params.fingerprint_file:
+        with run.metrics.Stage("plan"):
+            PlanOutputs(run)
+            SaveFingerprints(run, [output for output in run.outputs
+                                   if run.actions[output] == profile_incremental.ACTION_UNCHANGED])
+        for output in run.outputs:
+            AddMessage(run, f"{getattr(params, output)}: {run.actions[output]}")
+    result.actions = dict(run.actions)
+    rebuilt = RebuiltOutputs(run)
+
+    try:
+        # === Create output feature classes ===
+        # Worker processes create their outputs in their own scratch geodatabases
+        if rebuilt and concurrency != CONCURRENCY_PROCESSES:
+            with run.metrics.Stage("create"):
+                CreateOutputs(run)
+
+        # === Write outputs ===
+        # Lines, depth polygons and the bore connector are independent feature classes
+        if concurrency and rebuilt:
+            with run.metrics.Stage("write"):
+                written = WriteOutputsConcurrently(run, rebuilt)
+        else:
+            written = {output: WriteOutput(run, output) for output in rebuilt}
+        if "output_lines" in written:
+            AddMessage(run, f"Generated profile lines for {len(run.origins)} point(s)")
+        for output in rebuilt:
+            rows, summary = written[output]
+            AddMessage(run, summary)
+            result.rows[output] = rows
+
+        # === Update attributes in place ===
+        # Outputs whose geometry is unchanged only get their labels rewritten
+        for output in run.outputs:
+            if run.actions[output] == profile_incremental.ACTION_UPDATE:
+                with run.metrics.Stage("update"):
+                    updated = UpdateAttributes(run, output)
+                AddMessage(run, f"{getattr(params, output)}: updated {updated} row(s)")
+
+        # === Copy staged outputs ===
+        # One bulk copy per output replaces the many small writes to the target geodatabase
+        if Staged(params):
+            with run.metrics.Stage("copy"):
+                CopyStagedOutputs(run)
+            AddMessage(run, "Copied staged outputs from the memory workspace")
+    except Exception:
+        # Committed edit batches of a failed run are removed with their outputs
+        if params.edit_batch_size:
+            DeleteOutputs(run, rebuilt)
+        raise
+    finally:
+        if Staged(params):
+            DeleteStagedOutputs(run)
+
+    if params.fingerprint_file:
+        SaveFingerprints(run, run.outputs)
+
+    if Streaming(run):
+        AddMessage(run, f"Streamed features in chunks of up to {params.chunk_size}")
+    else:
+        cache = profile_geometry.ProfileTemplate.cache_info()
+        AddMessage(run, f"Layout templates: {cache.hits} hits, {cache.misses} misses, "
+                        f"{cache.currsize}/{cache.maxsize} cached")
+
+    # Add feature classes to the map; file outputs are meant for use outside ArcGIS Pro,
+    # and headless runs (scripts, workers, batch jobs) have no map to add them to
+    if params.add_to_map and not OutputFormat(params) and profile_map.InsideArcGISPro():
+        with run.metrics.Stage("map"):
+            AddToMap(run)
+
+    # === Instrumentation ===
+    result.elapsed = run.metrics.elapsed
+    for line in run.metrics.Summary():
+        AddMessage(run, line)
+    if params.metrics_log:
+        run.metrics.WriteLog(params.metrics_log, outputs={output: getattr(params, output) for output in run.outputs},
+                             profile_count=result.profile_count, rows=result.rows, chunk_size=params.chunk_size)
+    return result
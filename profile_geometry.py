@@ -0,0 +1,569 @@
+# === Profile geometry kernel ===
+# Pure NumPy layout math for PLAN_AND_PROFILE.py. Nothing here imports arcpy, so
+# profiles can be computed, tested and benchmarked without ArcGIS Pro.
+
+import collections
+import threading
+
+import numpy as np
+
+# === Feature roles ===
+# Every segment and polygon produced by the kernel carries a role code so the writer
+# can tell construction lines from the final profile graphics. Codes are one byte per
+# feature; ROLE_NAMES gives the text written to the Role field.
+ROLE_BORE_LINE = 0        # Main bore line (x1 -> x -> x2)
+ROLE_EXTENSION = 1        # Width extensions (temporary construction lines)
+ROLE_TICK = 2             # 1ft extension ticks
+ROLE_COMBINED = 3         # Combined dimension line along the bore axis
+ROLE_GRID_HORIZONTAL = 4  # Horizontal row edges
+ROLE_GRID_VERTICAL = 5    # Vertical row edges
+ROLE_DEPTH_EDGE = 6       # Depth rectangle outlines (temporary construction lines)
+ROLE_DEPTH = 7            # Depth polygons
+ROLE_BACKGROUND = 8       # Background polygon covering the grid
+ROLE_BORE_CONNECTION = 9  # Line joining the bottom of the depth polygons
+ROLE_GRID_CELL = 10       # One polygon per grid row
+ROLE_NAMES = ("BORE_LINE", "EXTENSION", "TICK", "COMBINED", "GRID_HORIZONTAL", "GRID_VERTICAL",
+              "DEPTH_EDGE", "DEPTH", "BACKGROUND", "BORE_CONNECTION", "GRID_CELL")
+
+# Construction lines the original pipeline inserted and then deleted again; they are
+# never part of the written profile
+CONSTRUCTION_ROLES = (ROLE_EXTENSION, ROLE_DEPTH_EDGE)
+
+# PolyID values shared by depth lines and depth polygons
+POLY_ID_BACKGROUND = 0
+POLY_ID_WEST = 1  # Left of bore line, uses depth_type2 / depth_dimension2 / width_dimension2
+POLY_ID_EAST = 2  # Right of bore line, uses depth_type1 / depth_dimension1 / width_dimension1
+POLY_ID_NONE = -1
+
+# Origin-relative layout templates kept by ProfileTemplate, bounded by count and by the
+# total size of their arrays; a template larger than the whole budget is not cached
+TEMPLATE_CACHE_SIZE = 128
+TEMPLATE_CACHE_BYTES = 128 * 1024 * 1024
+
+# Parallel attribute record for every feature in a FeatureArray
+ATTRIBUTE_DTYPE = np.dtype([("Role", "u1"), ("PolyID", "i4")])
+
+
+class FeatureArray:
+    """Contiguous vertex array for a group of features.
+
+    coords holds every vertex as an (n, 2) float array, offsets marks where each
+    feature starts and ends in coords (len(features) + 1 entries), and attributes
+    is a structured array with one record per feature. Multipart features also set
+    part_offsets, the coords index where every part starts; None means one part per
+    feature.
+    """
+
+    __slots__ = ("coords", "offsets", "attributes", "part_offsets")
+
+    def __init__(self, coords, offsets, attributes, part_offsets=None):
+        self.coords = coords
+        self.offsets = offsets
+        self.attributes = attributes
+        self.part_offsets = part_offsets
+
+    def __len__(self):
+        return len(self.attributes)
+
+    @property
+    def vertex_count(self):
+        return len(self.coords)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the coordinate, offset and attribute arrays"""
+        part_bytes = 0 if self.part_offsets is None else self.part_offsets.nbytes
+        return self.coords.nbytes + self.offsets.nbytes + self.attributes.nbytes + part_bytes
+
+    @property
+    def part_starts(self):
+        """coords index where every part starts"""
+        return self.offsets[:-1] if self.part_offsets is None else self.part_offsets
+
+    @property
+    def part_count(self):
+        return len(self.part_starts)
+
+    def vertices(self, index):
+        """Return the (n, 2) vertex slice of a single feature (every part)"""
+        return self.coords[self.offsets[index]:self.offsets[index + 1]]
+
+    def parts(self, index):
+        """Return the (n, 2) vertex slice of each part of a single feature"""
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        if self.part_offsets is None:
+            return [self.coords[start:stop]]
+        first, last = np.searchsorted(self.part_offsets, [start, stop])
+        bounds = self.part_offsets[first:last].tolist() + [stop]
+        return [self.coords[lower:upper] for lower, upper in zip(bounds[:-1], bounds[1:])]
+
+    def select(self, mask):
+        """Return a new FeatureArray holding only the features where mask is True"""
+        mask = np.asarray(mask, dtype=bool)
+        counts = np.diff(self.offsets)[mask]
+        vertex_mask = np.repeat(mask, np.diff(self.offsets))
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        part_offsets = None
+        if self.part_offsets is not None:
+            # Kept parts move down by the number of dropped vertices before them
+            kept_before = np.cumsum(vertex_mask) - vertex_mask
+            part_offsets = kept_before[self.part_offsets[vertex_mask[self.part_offsets]]]
+        return FeatureArray(self.coords[vertex_mask], offsets, self.attributes[mask], part_offsets)
+
+
+class ProfileLayout:
+    """Complete profile geometry for one input point"""
+
+    __slots__ = ("lines", "polygons", "connector", "cells")
+
+    def __init__(self, lines, polygons, connector, cells):
+        self.lines = lines          # output_lines features
+        self.polygons = polygons    # depth_polygons features
+        self.connector = connector  # bore_line features
+        self.cells = cells          # grid_cells features
+
+    @property
+    def nbytes(self):
+        return sum(features.nbytes for features in (self.lines, self.polygons, self.connector, self.cells))
+
+
+def _attributes(count, role, poly_id=POLY_ID_NONE):
+    """Build an attribute array with the same role and PolyID for count features"""
+    attributes = np.empty(count, dtype=ATTRIBUTE_DTYPE)
+    attributes["Role"] = role
+    attributes["PolyID"] = poly_id
+    return attributes
+
+
+def Segments(start_x, start_y, end_x, end_y, role, poly_id=POLY_ID_NONE):
+    """Build a FeatureArray of two-point lines from broadcastable coordinate arrays"""
+    start_x, start_y, end_x, end_y = np.broadcast_arrays(
+        np.asarray(start_x, dtype=float), np.asarray(start_y, dtype=float),
+        np.asarray(end_x, dtype=float), np.asarray(end_y, dtype=float)
+    )
+    count = start_x.size
+    coords = np.empty((count, 2, 2), dtype=float)
+    coords[:, 0, 0] = start_x.ravel()
+    coords[:, 0, 1] = start_y.ravel()
+    coords[:, 1, 0] = end_x.ravel()
+    coords[:, 1, 1] = end_y.ravel()
+
+    poly_id = np.broadcast_to(np.asarray(poly_id), start_x.shape).ravel()
+    attributes = _attributes(count, role)
+    attributes["PolyID"] = poly_id
+    return FeatureArray(coords.reshape(-1, 2), np.arange(0, 2 * count + 1, 2, dtype=np.int64), attributes)
+
+
+def Rings(left, bottom, right, top, role, poly_id=POLY_ID_NONE):
+    """Build a FeatureArray of closed rectangles (clockwise from the top left corner)"""
+    left, bottom, right, top = np.broadcast_arrays(
+        np.asarray(left, dtype=float), np.asarray(bottom, dtype=float),
+        np.asarray(right, dtype=float), np.asarray(top, dtype=float)
+    )
+    count = left.size
+    coords = np.empty((count, 5, 2), dtype=float)
+    coords[:, [0, 3, 4], 0] = left.reshape(-1, 1)
+    coords[:, [1, 2], 0] = right.reshape(-1, 1)
+    coords[:, [0, 1, 4], 1] = top.reshape(-1, 1)
+    coords[:, [2, 3], 1] = bottom.reshape(-1, 1)
+
+    poly_id = np.broadcast_to(np.asarray(poly_id), left.shape).ravel()
+    attributes = _attributes(count, role)
+    attributes["PolyID"] = poly_id
+    return FeatureArray(coords.reshape(-1, 2), np.arange(0, 5 * count + 1, 5, dtype=np.int64), attributes)
+
+
+def Concatenate(feature_arrays):
+    """Join several FeatureArrays into one contiguous FeatureArray"""
+    feature_arrays = [features for features in feature_arrays if len(features)]
+    if not feature_arrays:
+        return FeatureArray(np.empty((0, 2), dtype=float), np.zeros(1, dtype=np.int64),
+                            np.empty(0, dtype=ATTRIBUTE_DTYPE))
+
+    coords = np.concatenate([features.coords for features in feature_arrays])
+    attributes = np.concatenate([features.attributes for features in feature_arrays])
+
+    # Shift each group's offsets by the number of vertices that precede it
+    vertex_starts = np.cumsum([0] + [features.vertex_count for features in feature_arrays[:-1]])
+    offsets = np.concatenate(
+        [features.offsets[:-1] + start for features, start in zip(feature_arrays, vertex_starts)]
+        + [np.array([len(coords)], dtype=np.int64)]
+    )
+    part_offsets = None
+    if any(features.part_offsets is not None for features in feature_arrays):
+        part_offsets = np.concatenate(
+            [features.part_starts + start for features, start in zip(feature_arrays, vertex_starts)]
+        )
+    return FeatureArray(coords, offsets, attributes, part_offsets)
+
+
+def MergeParts(features):
+    """Combine each run of consecutive features sharing Role and PolyID into one multipart feature
+
+    Every logical group of a profile (bore line, ticks, combined line, grid rules and
+    the west and east rails) is contiguous in kernel order, so each becomes a single
+    feature whose parts are the original features.
+    """
+    if not len(features):
+        return features
+    attributes = features.attributes
+    starts = np.flatnonzero(np.concatenate([[True], attributes[1:] != attributes[:-1]]))
+    offsets = np.append(features.offsets[starts], features.offsets[-1])
+    return FeatureArray(features.coords, offsets, attributes[starts], features.part_starts)
+
+
+def WithoutConstruction(features):
+    """Drop the temporary construction lines, keeping only features that are written"""
+    return features.select(~np.isin(features.attributes["Role"], CONSTRUCTION_ROLES))
+
+
+def SplitRows(row_number):
+    """Split row_number into rows above and below the bore line (odd rows add one below)"""
+    rows_above = row_number // 2
+    rows_below = row_number - rows_above
+    return rows_above, rows_below
+
+
+def BoreLineCoordinates(x, y, half_length):
+    """Main bore line from the center point, returned with its end X coordinates"""
+    # Define direction (horizontal here)
+    x1 = x - half_length
+    x2 = x + half_length
+
+    coords = np.array([[x1, y], [x, y], [x2, y]], dtype=float)
+    line = FeatureArray(coords, np.array([0, 3], dtype=np.int64), _attributes(1, ROLE_BORE_LINE))
+    return line, x1, x2
+
+
+def GraphicLineCoordinates(y, x1, x2, width_dimension1, width_dimension2):
+    """Width extensions and 1ft ticks at both ends of the bore line"""
+    # East (right) uses width_dimension1, west (left) uses width_dimension2
+    extensions = Segments(
+        [x1 - width_dimension2, x2],
+        y,
+        [x1, x2 + width_dimension1],
+        y,
+        ROLE_EXTENSION
+    )
+
+    # 1ft ticks: far west end, west connection, east connection, far east end
+    tick_starts = np.array([x1 - width_dimension2 - 1, x1, x2 - 1, x2 + width_dimension1])
+    ticks = Segments(tick_starts, y, tick_starts + 1, y, ROLE_TICK)
+
+    return Concatenate([extensions, ticks])
+
+
+def RectangleCoordinates(y, x1, x2, row_number, width_dimension1, width_dimension2, per_row_verticals=False):
+    """Combined dimension line plus the 1ft rows stacked above and below the bore line
+
+    Each unique horizontal rule is emitted once; the rule on the bore line is the
+    combined dimension line itself. Each side gets a single vertical rail spanning
+    the whole grid unless per_row_verticals asks for one 1ft segment per row.
+    """
+    # Far extents include the width dimensions plus the 1ft ticks
+    left = x1 - (width_dimension2 + 1)
+    right = x2 + (width_dimension1 + 1)
+
+    combined = Segments(left, y, right, y, ROLE_COMBINED)
+
+    rows_above, rows_below = SplitRows(row_number)
+    if row_number <= 0:
+        return combined
+
+    rules = GridRuleCoordinates(y, left, right, rows_above, rows_below)
+    rails = GridRailCoordinates(y, left, right, rows_above, rows_below, per_row_verticals)
+    return Concatenate([combined, rules, rails])
+
+
+def GridRuleCoordinates(y, left, right, rows_above, rows_below, start=0, stop=None):
+    """Horizontal rules start..stop of the grid: the rules above (north) the combined line, then below (south)"""
+    stop = rows_above + rows_below if stop is None else stop
+    index = np.arange(start, stop)
+    rule_y = np.where(index < rows_above, y + index + 1, y - (index - rows_above + 1))
+    return Segments(left, rule_y, right, rule_y, ROLE_GRID_HORIZONTAL)
+
+
+def GridRailCount(row_number, per_row_verticals=False):
+    """Number of vertical grid edges: one rail per side, or one 1ft segment per row and side"""
+    return 2 * row_number if per_row_verticals else 2
+
+
+def GridRailCoordinates(y, left, right, rows_above, rows_below, per_row_verticals=False, start=0, stop=None):
+    """Vertical edges start..stop of the grid: the west (PolyID 1) side, then the east (PolyID 2) side"""
+    per_side = GridRailCount(rows_above + rows_below, per_row_verticals) // 2
+    stop = 2 * per_side if stop is None else stop
+    index = np.arange(start, stop)
+    west = index < per_side
+    if per_row_verticals:
+        bottom_y = y - rows_below + index % per_side
+        top_y = bottom_y + 1
+    else:
+        bottom_y = y - rows_below
+        top_y = y + rows_above
+    side_x = np.where(west, left, right)
+    return Segments(side_x, bottom_y, side_x, top_y, ROLE_GRID_VERTICAL, np.where(west, POLY_ID_WEST, POLY_ID_EAST))
+
+
+def DepthRectangleCorners(x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+                          width_dimension1, width_dimension2):
+    """Return (left, bottom, right, top) arrays for the west and east depth rectangles"""
+    rows_above, _ = SplitRows(row_number)
+    top_row_y = y + rows_above
+
+    left = np.array([x - half_length - width_dimension2, x + half_length])
+    right = np.array([x - half_length, x + half_length + width_dimension1])
+    bottom = np.array([top_row_y - depth_dimension2, top_row_y - depth_dimension1])
+    top = np.array([top_row_y, top_row_y])
+    return left, bottom, right, top
+
+
+def DepthCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+                     width_dimension1, width_dimension2):
+    """Outline segments of the west (PolyID 1) and east (PolyID 2) depth rectangles"""
+    left, bottom, right, top = DepthRectangleCorners(
+        x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+        width_dimension1, width_dimension2
+    )
+
+    # Top, bottom, left and right edges for west then east
+    start_x = np.stack([left, left, left, right], axis=1)
+    end_x = np.stack([right, right, left, right], axis=1)
+    start_y = np.stack([top, bottom, top, top], axis=1)
+    end_y = np.stack([top, bottom, bottom, bottom], axis=1)
+    poly_id = np.array([[POLY_ID_WEST], [POLY_ID_EAST]])
+
+    return Segments(start_x, start_y, end_x, end_y, ROLE_DEPTH_EDGE, poly_id)
+
+
+def PolygonCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+                       width_dimension1, width_dimension2):
+    """West and east depth polygons followed by the background polygon covering the grid"""
+    left, bottom, right, top = DepthRectangleCorners(
+        x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+        width_dimension1, width_dimension2
+    )
+    depth = Rings(left, bottom, right, top, ROLE_DEPTH, np.array([POLY_ID_WEST, POLY_ID_EAST]))
+    background = Rings(*GridExtent(x, y, half_length, row_number, width_dimension1, width_dimension2),
+                       ROLE_BACKGROUND, POLY_ID_BACKGROUND)
+    return Concatenate([depth, background])
+
+
+def GridExtent(x, y, half_length, row_number, width_dimension1, width_dimension2):
+    """(left, bottom, right, top) of the row grid, the area covered by the background polygon"""
+    rows_above, rows_below = SplitRows(row_number)
+    return (x - half_length - (width_dimension2 + 1), y - rows_below,
+            x + half_length + (width_dimension1 + 1), y + rows_above)
+
+
+def GridCellCoordinates(x, y, half_length, row_number, width_dimension1, width_dimension2, start=0, stop=None):
+    """Grid rows start..stop as polygons spanning the background, from the top row down
+
+    Row i (0-based) has its top edge rows_above - i feet above the bore line, so each
+    ring's first vertex (top left) gives its row.
+    """
+    left, _, right, _ = GridExtent(x, y, half_length, row_number, width_dimension1, width_dimension2)
+    rows_above, _ = SplitRows(row_number)
+    stop = row_number if stop is None else stop
+    top = y + rows_above - np.arange(start, stop)
+    return Rings(left, top - 1, right, top, ROLE_GRID_CELL, POLY_ID_BACKGROUND)
+
+
+def BoreConnectorCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2):
+    """Line from the bottom right corner of polygon 1 to the bottom left corner of polygon 2"""
+    rows_above, _ = SplitRows(row_number)
+    top_row_y = y + rows_above
+    return Segments(x - half_length, top_row_y - depth_dimension2,
+                    x + half_length, top_row_y - depth_dimension1,
+                    ROLE_BORE_CONNECTION)
+
+
+def ProfileLayoutCoordinates(x, y, input_length, row_number, depth_dimension1, depth_dimension2,
+                             width_dimension1, width_dimension2, include_construction=False,
+                             per_row_verticals=False, include_cells=True):
+    """Compute every line and polygon of a profile centered on (x, y)
+
+    Construction lines (width extensions and depth rectangle outlines) are only
+    included in lines when include_construction is True; cells is empty unless
+    include_cells is True.
+    """
+    half_length = input_length / 2.0
+
+    bore, x1, x2 = BoreLineCoordinates(x, y, half_length)
+    lines = Concatenate([
+        bore,
+        GraphicLineCoordinates(y, x1, x2, width_dimension1, width_dimension2),
+        RectangleCoordinates(y, x1, x2, row_number, width_dimension1, width_dimension2, per_row_verticals),
+        DepthCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+                         width_dimension1, width_dimension2),
+    ])
+    if not include_construction:
+        lines = WithoutConstruction(lines)
+    polygons = PolygonCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2,
+                                  width_dimension1, width_dimension2)
+    connector = BoreConnectorCoordinates(x, y, half_length, row_number, depth_dimension1, depth_dimension2)
+    if include_cells:
+        cells = GridCellCoordinates(x, y, half_length, row_number, width_dimension1, width_dimension2)
+    else:
+        cells = Concatenate([])
+
+    return ProfileLayout(lines, polygons, connector, cells)
+
+
+def ProfileLineChunks(x, y, input_length, row_number, width_dimension1, width_dimension2,
+                      per_row_verticals=False, chunk_size=10000):
+    """Yield the written output_lines of a profile as FeatureArrays of at most chunk_size features
+
+    Produces the same features in the same order as ProfileLayoutCoordinates(...).lines,
+    but the grid is computed one index range at a time, so memory stays bounded by
+    chunk_size however large row_number is.
+    """
+    half_length = input_length / 2.0
+    bore, x1, x2 = BoreLineCoordinates(x, y, half_length)
+    head = WithoutConstruction(Concatenate([
+        bore,
+        GraphicLineCoordinates(y, x1, x2, width_dimension1, width_dimension2),
+        RectangleCoordinates(y, x1, x2, 0, width_dimension1, width_dimension2),
+    ]))
+
+    # (feature count, builder for features start..stop) for each part of the profile
+    left = x1 - (width_dimension2 + 1)
+    right = x2 + (width_dimension1 + 1)
+    rows_above, rows_below = SplitRows(row_number)
+    head_index = np.arange(len(head))
+    parts = [(len(head), lambda start, stop: head.select((head_index >= start) & (head_index < stop)))]
+    if row_number > 0:
+        parts.append((row_number, lambda start, stop: GridRuleCoordinates(
+            y, left, right, rows_above, rows_below, start, stop)))
+        parts.append((GridRailCount(row_number, per_row_verticals), lambda start, stop: GridRailCoordinates(
+            y, left, right, rows_above, rows_below, per_row_verticals, start, stop)))
+
+    pending, pending_count = [], 0
+    for count, build in parts:
+        start = 0
+        while start < count:
+            stop = min(count, start + chunk_size - pending_count)
+            pending.append(build(start, stop))
+            pending_count += stop - start
+            start = stop
+            if pending_count == chunk_size:
+                yield Concatenate(pending)
+                pending, pending_count = [], 0
+    if pending:
+        yield Concatenate(pending)
+
+
+TemplateCacheInfo = collections.namedtuple("TemplateCacheInfo", "hits misses maxsize currsize nbytes")
+
+
+class TemplateCache:
+    """Least recently used layouts, bounded by entry count and by total array bytes
+
+    Offers cache_info()/cache_clear() like functools.lru_cache. Lookups are locked so
+    writer threads can share it; layouts are built outside the lock.
+    """
+
+    def __init__(self, maxsize, max_bytes):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._layouts = collections.OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def Get(self, key, build):
+        """Cached layout for key, calling build() and caching its result on a miss"""
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self._hits += 1
+                return layout
+            self._misses += 1
+        layout = build()
+        if layout.nbytes > self.max_bytes:
+            return layout
+        with self._lock:
+            if key not in self._layouts:
+                self._layouts[key] = layout
+                self._bytes += layout.nbytes
+                while len(self._layouts) > self.maxsize or self._bytes > self.max_bytes:
+                    _, evicted = self._layouts.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+        return layout
+
+    def cache_info(self):
+        with self._lock:
+            return TemplateCacheInfo(self._hits, self._misses, self.maxsize, len(self._layouts), self._bytes)
+
+    def cache_clear(self):
+        with self._lock:
+            self._layouts.clear()
+            self._bytes = self._hits = self._misses = 0
+
+
+TEMPLATE_CACHE = TemplateCache(TEMPLATE_CACHE_SIZE, TEMPLATE_CACHE_BYTES)
+
+
+def ProfileTemplate(input_length, row_number, depth_dimension1, depth_dimension2,
+                    width_dimension1, width_dimension2, per_row_verticals=False, multipart=False, cells=False):
+    """Origin-relative profile layout, cached per layout parameter tuple
+
+    Every profile with the same dimensions has the same shape relative to its input
+    point, so the layout is computed once at (0, 0) and placed with TranslateFeatures.
+    The cached arrays are read-only because they are shared between profiles. With
+    multipart each group of lines is merged into one multipart feature (MergeParts).
+    Grid cells are only built with cells, so runs without a grid_cells output do not
+    pay for them.
+    """
+    key = (input_length, row_number, depth_dimension1, depth_dimension2, width_dimension1, width_dimension2,
+           per_row_verticals, multipart, cells)
+    return TEMPLATE_CACHE.Get(key, lambda: _BuildTemplate(*key))
+
+
+ProfileTemplate.cache_info = TEMPLATE_CACHE.cache_info
+ProfileTemplate.cache_clear = TEMPLATE_CACHE.cache_clear
+
+
+def _BuildTemplate(input_length, row_number, depth_dimension1, depth_dimension2,
+                   width_dimension1, width_dimension2, per_row_verticals, multipart, cells):
+    layout = ProfileLayoutCoordinates(0.0, 0.0, input_length, row_number, depth_dimension1,
+                                      depth_dimension2, width_dimension1, width_dimension2,
+                                      per_row_verticals=per_row_verticals, include_cells=cells)
+    if multipart:
+        layout.lines = MergeParts(layout.lines)
+    for features in (layout.lines, layout.polygons, layout.connector, layout.cells):
+        features.coords.setflags(write=False)
+        features.offsets.setflags(write=False)
+        features.attributes.setflags(write=False)
+        if features.part_offsets is not None:
+            features.part_offsets.setflags(write=False)
+    return layout
+
+
+def TranslateFeatures(features, x, y):
+    """Place origin-relative template features at (x, y) with a single array add"""
+    return FeatureArray(features.coords + (x, y), features.offsets, features.attributes, features.part_offsets)
+
+
+def BearingMatrix(bearing):
+    """Row-vector rotation taking the local bore axis (+x, azimuth 90) to the given azimuth
+
+    Azimuths are degrees clockwise from north, so the counterclockwise angle is 90 - bearing.
+    """
+    angle = np.radians(90.0 - bearing)
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.array([[cos, sin], [-sin, cos]])
+
+
+def PlaceFeatures(features, x, y, bearing=None):
+    """Place origin-relative features at (x, y) with the bore axis along bearing
+
+    The whole coordinate array is rotated and translated in one batched affine
+    transform; without a bearing this is TranslateFeatures.
+    """
+    if bearing is None or bearing == 90.0:
+        return TranslateFeatures(features, x, y)
+    coords = features.coords @ BearingMatrix(bearing) + (x, y)
+    return FeatureArray(coords, features.offsets, features.attributes, features.part_offsets)
@@ -0,0 +1,88 @@
+# === Incremental regeneration ===
+# Fingerprints of the inputs each output depends on, persisted in a JSON state file so
+# a rerun only rebuilds the outputs whose geometry changed and updates attributes in
+# place when only labels changed.
+
+import hashlib
+import json
+import os
+
+FINGERPRINT_VERSION = 1
+
+# === Output components ===
+# Per-profile values each output's geometry and attribute values are derived from.
+# output_lines does not depend on the depth dimensions: the depth rectangle outlines
+# are construction lines that are never written.
+GEOMETRY_COMPONENTS = {
+    "output_lines": ("x", "y", "bearing", "input_length", "row_number", "width_dimension1", "width_dimension2"),
+    "depth_polygons": ("x", "y", "bearing", "input_length", "row_number", "depth_dimension1", "depth_dimension2",
+                       "width_dimension1", "width_dimension2"),
+    "bore_line": ("x", "y", "bearing", "input_length", "row_number", "depth_dimension1", "depth_dimension2"),
+    "grid_cells": ("x", "y", "bearing", "input_length", "row_number", "width_dimension1", "width_dimension2"),
+}
+ATTRIBUTE_COMPONENTS = {
+    "output_lines": ("depth_type1", "depth_type2"),
+    "depth_polygons": ("depth_type1", "depth_type2", "title"),
+    "bore_line": (),
+    "grid_cells": (),  # Row attributes follow from the geometry
+}
+
+# === Actions ===
+ACTION_REBUILD = "rebuilt"      # Output recreated and every feature written
+ACTION_UPDATE = "updated"       # Geometry unchanged; attribute values rewritten in place
+ACTION_UNCHANGED = "unchanged"  # Nothing to do
+
+
+def _Digest(values):
+    return hashlib.sha1(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+
+
+def SpatialReferenceKey(spatial_ref):
+    """Comparable identity of a spatial reference (factory code and name)"""
+    if spatial_ref is None:
+        return None
+    return [getattr(spatial_ref, "factoryCode", None), getattr(spatial_ref, "name", str(spatial_ref))]
+
+
+def OutputFingerprint(output, origins, spatial_ref, per_row_verticals=False, multipart=False, chunk_size=0):
+    """Geometry and attribute digests for output over every ProfileOrigin
+
+    chunk_size only changes output_lines when multipart splits groups at chunk boundaries.
+    """
+    geometry = [[origin.profile_id] + [getattr(origin, name) for name in GEOMETRY_COMPONENTS[output]]
+                for origin in origins]
+    settings = [FINGERPRINT_VERSION, SpatialReferenceKey(spatial_ref)]
+    if output == "output_lines":
+        settings.extend([per_row_verticals, multipart])
+        if multipart:
+            settings.append(chunk_size)
+    attributes = [[origin.profile_id] + [getattr(origin, name) for name in ATTRIBUTE_COMPONENTS[output]]
+                  for origin in origins]
+    return {"geometry": _Digest([settings, geometry]), "attributes": _Digest(attributes)}
+
+
+def PlanAction(fingerprint, previous, exists):
+    """Action needed to bring an output with the previous fingerprint up to date"""
+    if not exists or not previous or previous.get("geometry") != fingerprint["geometry"]:
+        return ACTION_REBUILD
+    if previous.get("attributes") != fingerprint["attributes"]:
+        return ACTION_UPDATE
+    return ACTION_UNCHANGED
+
+
+def ReadState(path):
+    """Saved fingerprints keyed by output path ({} when the state file is missing or unreadable)"""
+    try:
+        with open(path, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+    return state.get("outputs", {}) if state.get("version") == FINGERPRINT_VERSION else {}
+
+
+def WriteState(path, outputs):
+    """Save the fingerprints keyed by output path, replacing the file atomically"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as state_file:
+        json.dump({"version": FINGERPRINT_VERSION, "outputs": outputs}, state_file, indent=2)
+    os.replace(temporary, path)
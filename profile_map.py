@@ -0,0 +1,122 @@
+# === Map injection ===
+# Shows the outputs in the active map of the current ArcGIS Pro project in one pass:
+# layers already drawing an output are reused (and refreshed when it was rebuilt),
+# missing ones are added together to a single group layer, symbolized from a .lyrx
+# template loaded once per process, and nothing happens outside ArcGIS Pro.
+
+import functools
+import os
+import sys
+
+GROUP_LAYER_NAME = "Bore Profile"
+
+# (parameter, layer name) of every layer the stage manages, top to bottom in the group;
+# template sublayers with the same names provide their symbology
+MAP_LAYERS = [
+    ("input_points", "Profile Points"),
+    ("bore_line", "Bore Line"),
+    ("output_lines", "Output Lines"),
+    ("depth_polygons", "Depth Polygons"),
+    ("grid_cells", "Grid Cells"),
+]
+
+
+def InsideArcGISPro():
+    """True when running in the ArcGIS Pro application, the only place a CURRENT project exists"""
+    return os.path.basename(sys.executable).lower() == "arcgispro.exe"
+
+
+def NormalizedPath(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+@functools.lru_cache(maxsize=8)
+def _LayerFile(path, modified):
+    import arcpy
+    return arcpy.mp.LayerFile(path)
+
+
+def LayerTemplate(path):
+    """arcpy.mp.LayerFile for path, loaded once per process until the file changes"""
+    return _LayerFile(os.path.abspath(path), os.path.getmtime(path))
+
+
+def ExistingLayers(map_obj):
+    """Layers of map_obj keyed by their normalized data source, and the output group layer if present"""
+    layers, group = {}, None
+    for layer in map_obj.listLayers():
+        if layer.isGroupLayer and layer.name == GROUP_LAYER_NAME and group is None:
+            group = layer
+        elif layer.supports("DATASOURCE"):
+            layers.setdefault(NormalizedPath(layer.dataSource), layer)
+    return layers, group
+
+
+def RefreshLayer(layer):
+    """Reapply a layer's definition so it reconnects to its recreated data source"""
+    layer.setDefinition(layer.getDefinition("V3"))
+
+
+def PointLayerAt(layer, source):
+    """Point a template layer at the data of source, a feature layer made on the output
+
+    The connection properties are taken whole from source, so the workspace factory and
+    connection info match the output's workspace (file or enterprise geodatabase,
+    shapefile folder) whatever workspace the template was authored against.
+    """
+    layer.updateConnectionProperties(layer.connectionProperties, source.connectionProperties)
+
+
+def TemplateLayers(template):
+    """Template sublayers keyed by name ({} without a template)"""
+    if not template:
+        return {}
+    return {layer.name: layer for layer in LayerTemplate(template).listLayers() if not layer.isGroupLayer}
+
+
+def InjectLayers(layers, refresh=(), template=""):
+    """Show every (layer name, path) of layers in the active map; returns (messages, warnings)
+
+    Layers already drawing a path are reused, and refreshed when the path is in refresh.
+    The others are added to the GROUP_LAYER_NAME group layer, created on first use,
+    from the template sublayer of the same name or as plain feature layers.
+    """
+    import arcpy
+
+    map_obj = arcpy.mp.ArcGISProject("CURRENT").activeMap
+    if map_obj is None:
+        return [], ["No active map; the outputs were not added"]
+
+    messages, warnings = [], []
+    existing, group = ExistingLayers(map_obj)
+    refresh = {NormalizedPath(path) for path in refresh}
+    missing = []
+    for name, path in layers:
+        layer = existing.get(NormalizedPath(path))
+        if layer is not None:
+            if NormalizedPath(path) in refresh:
+                RefreshLayer(layer)
+                messages.append(f"Refreshed {layer.name} in map")
+        elif arcpy.Exists(path):
+            missing.append((name, path))
+        else:
+            warnings.append(f"Feature class {path} does not exist and cannot be added to map")
+    if not missing:
+        return messages, warnings
+
+    # === Add missing layers ===
+    # One group holds every output; maps without createGroupLayer get top-level layers
+    if group is None and hasattr(map_obj, "createGroupLayer"):
+        group = map_obj.createGroupLayer(GROUP_LAYER_NAME)
+    symbology = TemplateLayers(template)
+    for name, path in missing:
+        source = arcpy.MakeFeatureLayer_management(path, name).getOutput(0)
+        layer = symbology.get(name, source)
+        if group is not None:
+            added = map_obj.addLayerToGroup(group, layer, "BOTTOM")[0]
+        else:
+            added = map_obj.addLayer(layer, "BOTTOM")[0]
+        if name in symbology:
+            PointLayerAt(added, source)
+        messages.append(f"Added {name} to map")
+    return messages, warnings
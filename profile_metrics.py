@@ -0,0 +1,161 @@
+# === Run instrumentation ===
+# Lightweight per-stage counters for generate_profile: wall time, geometry objects
+# created, rows inserted/updated and cursor opens. Counting is a dictionary
+# add, cheap enough to leave on in production.
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+COUNTERS = ("geometries", "inserted", "updated", "cursors", "commits", "rollbacks")
+OPTIONAL_COUNTERS = ("commits", "rollbacks")  # Edit session counters, left out of the total while zero
+
+
+def PeakRSS():
+    """Peak resident set size of this process in bytes, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        return _WindowsPeakRSS()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def _WindowsPeakRSS():
+    """Peak working set from GetProcessMemoryInfo"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage"
+                )
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+def PeakRSSMegabytes():
+    peak = PeakRSS()
+    return round(peak / 2 ** 20, 1) if peak is not None else None
+
+
+class StageMetrics:
+    """Wall time and counters for one pipeline stage"""
+
+    __slots__ = ("name", "elapsed") + COUNTERS
+
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = 0.0
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+
+    def AsDict(self):
+        record = {"stage": self.name, "seconds": round(self.elapsed, 6)}
+        record.update({counter: getattr(self, counter) for counter in COUNTERS})
+        return record
+
+    def Summary(self):
+        """One-line stage report for AddMessage"""
+        counts = ", ".join(f"{getattr(self, counter)} {counter}" for counter in COUNTERS if getattr(self, counter))
+        return f"{self.name}: {self.elapsed:.3f}s" + (f" ({counts})" if counts else "")
+
+
+class ProfileMetrics:
+    """Collects StageMetrics in pipeline order; counts go to the stage running on the calling thread
+
+    Stages may run concurrently on several threads, so the run's elapsed time is the wall
+    time during which any stage was running rather than the sum of the stage times.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._running_since = 0.0
+        self._wall = 0.0
+
+    @contextmanager
+    def Stage(self, name):
+        """Time a stage and attribute every Count inside it on this thread to that stage"""
+        stage = self.stages.setdefault(name, StageMetrics(name))
+        previous = getattr(self._local, "current", None)
+        self._local.current = stage
+        start = time.perf_counter()
+        with self._lock:
+            if not self._running:
+                self._running_since = start
+            self._running += 1
+        try:
+            yield stage
+        finally:
+            end = time.perf_counter()
+            stage.elapsed += end - start
+            with self._lock:
+                self._running -= 1
+                if not self._running:
+                    self._wall += end - self._running_since
+            self._local.current = previous
+
+    def Count(self, counter, amount=1):
+        """Add amount to counter on this thread's running stage (ignored outside a stage)"""
+        current = getattr(self._local, "current", None)
+        if current is not None:
+            setattr(current, counter, getattr(current, counter) + amount)
+
+    def Merge(self, records):
+        """Add stage records (StageMetrics.AsDict) collected in another process"""
+        for record in records:
+            stage = self.stages.setdefault(record["stage"], StageMetrics(record["stage"]))
+            stage.elapsed += record["seconds"]
+            for counter in COUNTERS:
+                setattr(stage, counter, getattr(stage, counter) + record.get(counter, 0))
+
+    @property
+    def elapsed(self):
+        return self._wall
+
+    def AsDict(self):
+        return {name: stage.AsDict() for name, stage in self.stages.items()}
+
+    def Summary(self):
+        """Stage reports followed by the run total, one line each"""
+        totals = {counter: sum(getattr(stage, counter) for stage in self.stages.values()) for counter in COUNTERS}
+        lines = [stage.Summary() for stage in self.stages.values()]
+        lines.append(f"total: {self.elapsed:.3f}s (" + ", ".join(f"{value} {name}" for name, value in totals.items()
+                                                              if value or name not in OPTIONAL_COUNTERS) + ")")
+        peak = PeakRSSMegabytes()
+        if peak is not None:
+            lines.append(f"peak RSS: {peak:,.1f} MB")
+        return lines
+
+    def WriteLog(self, path, **run_info):
+        """Append this run as one JSON line to path"""
+        record = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), **run_info, "seconds": round(self.elapsed, 6),
+                  "peak_rss_mb": PeakRSSMegabytes(), "stages": list(self.AsDict().values())}
+        with open(path, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(record) + "\n")
+
+
+class _NullMetrics:
+    """Stand-in used when no metrics are collected"""
+
+    def Count(self, counter, amount=1):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
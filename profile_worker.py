@@ -0,0 +1,133 @@
+# === Persistent profile worker ===
+# Long-running process that imports arcpy (and checks out its license) once, then
+# generates profiles for job files dropped into a queue directory.
+#
+# Queue layout (created on start):
+#   <queue>/*.json      new jobs
+#   <queue>/running/    jobs being processed
+#   <queue>/done/       finished jobs
+#   <queue>/failed/     jobs that raised an error
+#   <queue>/results/    one <job>.json status report per job
+#
+# A job is a JSON object holding either "parameters": [...] with the tool parameter
+# values in ModelBuilder order, or ProfileParameters fields by name, e.g.
+#   {"input_points": "C:/data/bores.gdb/points", "output_lines": "...", "row_number": 10, ...}
+#
+# With --no-arcpy the worker runs without ArcGIS Pro; its jobs give "points" and an
+# EPSG code as "spatial_reference" and write GeoJSON, GeoPackage or FlatGeobuf outputs.
+
+import argparse
+import dataclasses
+import glob
+import json
+import os
+import time
+import traceback
+
+import profile_generator
+
+QUEUE_FOLDERS = ("running", "done", "failed", "results")
+
+# ProfileParameters fields that only make sense in-process
+_IN_PROCESS_FIELDS = {"backend", "reporter"}
+JOB_FIELDS = [
+    parameter.name for parameter in dataclasses.fields(profile_generator.ProfileParameters)
+    if parameter.name not in _IN_PROCESS_FIELDS
+]
+
+
+def JobParameters(job):
+    """Convert a job document into ProfileParameters"""
+    if "parameters" in job:
+        return profile_generator.ParametersFromText(job["parameters"], add_to_map=False)
+
+    unknown = sorted(set(job) - set(JOB_FIELDS) - {"id"})
+    if unknown:
+        raise profile_generator.ProfileError(f"Unknown job parameter(s): {', '.join(unknown)}")
+    options = {name: value for name, value in job.items() if name in JOB_FIELDS}
+    options.setdefault("add_to_map", False)
+    return profile_generator.ProfileParameters(**options)
+
+
+def ProcessJob(queue, job_path):
+    """Claim, run and report a single job file; returns the status report or None if already claimed"""
+    name = os.path.basename(job_path)
+    running_path = os.path.join(queue, "running", name)
+    queued_at = os.path.getmtime(job_path) if os.path.exists(job_path) else time.time()
+    try:
+        # Moving the file claims it, so several workers can share one queue
+        os.replace(job_path, running_path)
+    except FileNotFoundError:
+        return None
+
+    start = time.perf_counter()
+    report = {"job": name, "status": "succeeded", "queued_seconds": round(time.time() - queued_at, 3)}
+    try:
+        with open(running_path, encoding="utf-8") as job_file:
+            job = json.load(job_file)
+        report["id"] = job.get("id", os.path.splitext(name)[0])
+
+        result = profile_generator.generate_profile(JobParameters(job))
+        report.update({
+            "outputs": {output: getattr(result, output) for output in profile_generator.OUTPUTS},
+            "profile_count": result.profile_count,
+            "rows": result.rows,
+            "actions": result.actions,
+            "estimate": result.estimate,
+            "generate_seconds": round(result.elapsed, 3),
+            "stages": list(result.metrics.AsDict().values()),
+            "messages": result.messages,
+        })
+        destination = "done"
+    except Exception as e:
+        report.update({"status": "failed", "error": str(e), "traceback": traceback.format_exc()})
+        destination = "failed"
+
+    report["run_seconds"] = round(time.perf_counter() - start, 3)
+    os.replace(running_path, os.path.join(queue, destination, name))
+    with open(os.path.join(queue, "results", name), "w", encoding="utf-8") as result_file:
+        json.dump(report, result_file, indent=2)
+    return report
+
+
+def RunWorker(queue, poll_interval=1.0, once=False, overwrite=False, use_arcpy=True):
+    """Process queued jobs until interrupted (or until the queue is empty when once is set)"""
+    for folder in QUEUE_FOLDERS:
+        os.makedirs(os.path.join(queue, folder), exist_ok=True)
+
+    # Pay the arcpy import and license checkout a single time for every job
+    if use_arcpy:
+        start = time.perf_counter()
+        import arcpy
+        arcpy.env.overwriteOutput = overwrite
+        print(f"arcpy loaded in {time.perf_counter() - start:.2f}s, watching {queue}")
+    else:
+        print(f"Running without arcpy, watching {queue}")
+
+    try:
+        while True:
+            for job_path in sorted(glob.glob(os.path.join(queue, "*.json"))):
+                report = ProcessJob(queue, job_path)
+                if report is not None:
+                    print(f"{report['job']}: {report['status']} in {report['run_seconds']}s")
+            if once:
+                break
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Worker stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate profiles for job files dropped into a queue directory")
+    parser.add_argument("queue", help="Queue directory to watch for *.json jobs")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between queue scans (default 1)")
+    parser.add_argument("--once", action="store_true", help="Process the queued jobs and exit")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing outputs")
+    parser.add_argument("--no-arcpy", action="store_true",
+                        help="Run without arcpy for jobs with points that write GeoJSON, GeoPackage or FlatGeobuf")
+    args = parser.parse_args()
+    RunWorker(args.queue, args.poll, args.once, args.overwrite, not args.no_arcpy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+# === Feature writers ===
+# Write kernel FeatureArrays into feature classes. arcpy is only imported by the
+# backend that talks to it, so writers can run against a local stand-in backend.
+
+import hashlib
+import os
+import struct
+import time
+
+import numpy as np
+
+import profile_metrics
+
+# === Write methods ===
+WRITE_METHOD_CURSOR = "CURSOR"  # One arcpy geometry object per feature through SHAPE@
+WRITE_METHOD_WKB = "WKB"        # Vectorized WKB encoding inserted through SHAPE@WKB
+WRITE_METHODS = (WRITE_METHOD_CURSOR, WRITE_METHOD_WKB)
+
+# WKB geometry type codes
+_WKB_TYPES = {"POLYLINE": 2, "POLYGON": 3}  # LineString, Polygon
+_WKB_MULTILINESTRING = 5                    # Multipart polylines
+
+
+# Prefix of the schema template feature classes kept in the scratch geodatabase
+SCHEMA_TEMPLATE_PREFIX = "profile_schema_"
+
+
+def SchemaTemplateName(geometry_type, schema):
+    """Stable template feature class name for a geometry type and (name, type, length) schema"""
+    key = repr((geometry_type, [tuple(field) for field in schema])).encode("utf-8")
+    return SCHEMA_TEMPLATE_PREFIX + hashlib.sha1(key).hexdigest()[:12]
+
+
+class ArcpyBackend:
+    """Default backend writing through arcpy.da cursors
+
+    Output schemas are built once as template feature classes in the scratch
+    geodatabase and cloned by CreateFeatureclass_management, so a run issues one
+    schema call per output instead of a create plus one AddField per field.
+    """
+
+    def __init__(self, schema_templates=True):
+        self.schema_templates = schema_templates
+
+    def CreateFeatureClass(self, path, geometry_type, schema, spatial_ref):
+        """Create an empty feature class with the (name, type, length) fields in schema"""
+        import arcpy
+        template = self.SchemaTemplate(geometry_type, schema) if self.schema_templates else None
+        arcpy.CreateFeatureclass_management(
+            out_path=os.path.dirname(path),
+            out_name=os.path.basename(path),
+            geometry_type=geometry_type,
+            template=template,
+            spatial_reference=spatial_ref
+        )
+        if template is None:
+            AddSchemaFields(path, schema)
+
+    def SchemaTemplate(self, geometry_type, schema):
+        """Path of the cached template for schema, created in the scratch geodatabase if missing"""
+        import arcpy
+        workspace = arcpy.env.scratchGDB
+        if not workspace:
+            return None
+        name = SchemaTemplateName(geometry_type, schema)
+        template = os.path.join(workspace, name)
+        if not arcpy.Exists(template):
+            arcpy.CreateFeatureclass_management(out_path=workspace, out_name=name, geometry_type=geometry_type)
+            AddSchemaFields(template, schema)
+        return template
+
+    def InsertCursor(self, path, fields):
+        import arcpy
+        return arcpy.da.InsertCursor(path, fields)
+
+    def UpdateCursor(self, path, fields):
+        import arcpy
+        return arcpy.da.UpdateCursor(path, fields)
+
+    def Exists(self, path):
+        import arcpy
+        return arcpy.Exists(path)
+
+    def CopyFeatures(self, source, target):
+        """Copy every row of source to a new feature class at target"""
+        import arcpy
+        arcpy.CopyFeatures_management(source, target)
+
+    def Delete(self, path):
+        """Delete path if it exists"""
+        import arcpy
+        if arcpy.Exists(path):
+            arcpy.Delete_management(path)
+
+    def Editor(self, workspace):
+        import arcpy
+        return arcpy.da.Editor(workspace)
+
+    def IsVersioned(self, path):
+        """True when path is registered as versioned and must be edited in multiuser mode"""
+        import arcpy
+        return bool(getattr(arcpy.Describe(path), "isVersioned", False))
+
+    def Geometry(self, geometry_type, vertices, spatial_ref):
+        """Build a geometry from an (n, 2) vertex array, or from a list of them for a multipart feature"""
+        import arcpy
+        if isinstance(vertices, list):
+            array = arcpy.Array([arcpy.Array([arcpy.Point(vx, vy) for vx, vy in part.tolist()]) for part in vertices])
+        else:
+            array = arcpy.Array([arcpy.Point(vx, vy) for vx, vy in vertices.tolist()])
+        geometry_class = arcpy.Polygon if geometry_type == "POLYGON" else arcpy.Polyline
+        return geometry_class(array, spatial_ref)
+
+
+def AddSchemaFields(path, schema):
+    """Add every (name, type, length) field in schema with a single AddFields_management call"""
+    import arcpy
+    arcpy.AddFields_management(
+        in_table=path,
+        field_description=[[name, field_type, name, length or ""] for name, field_type, length in schema]
+    )
+
+
+class MemoryBackend:
+    """Local stand-in backend keeping inserted rows in memory, keyed by output path"""
+
+    def __init__(self):
+        self.tables = {}
+        self.schemas = {}
+
+    def CreateFeatureClass(self, path, geometry_type, schema, spatial_ref):
+        self.schemas[path] = (geometry_type, list(schema), spatial_ref)
+        self.tables[path] = []
+
+    def InsertCursor(self, path, fields):
+        return _MemoryCursor(self.tables.setdefault(path, []))
+
+    def UpdateCursor(self, path, fields):
+        names = [name for name, _, _ in self.schemas[path][1]]
+        return _MemoryUpdateCursor(self.tables[path], [names.index(field) + 1 for field in fields])
+
+    def Exists(self, path):
+        return path in self.tables
+
+    def CopyFeatures(self, source, target):
+        self.schemas[target] = self.schemas[source]
+        self.tables[target] = list(self.tables[source])
+
+    def Delete(self, path):
+        self.schemas.pop(path, None)
+        self.tables.pop(path, None)
+
+    def Editor(self, workspace):
+        return _MemoryEditor(self.tables)
+
+    def IsVersioned(self, path):
+        return False
+
+    def Geometry(self, geometry_type, vertices, spatial_ref):
+        if isinstance(vertices, list):
+            return [[tuple(vertex) for vertex in part.tolist()] for part in vertices]
+        return [tuple(vertex) for vertex in vertices.tolist()]
+
+
+class _MemoryCursor:
+    """Insert cursor stand-in appending rows to a list"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def insertRow(self, row):
+        self.rows.append(tuple(row))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _MemoryUpdateCursor(_MemoryCursor):
+    """Update cursor stand-in over the given field positions of the stored rows"""
+
+    def __init__(self, rows, positions):
+        super().__init__(rows)
+        self.positions = positions
+        self._index = None
+
+    def __iter__(self):
+        for self._index, row in enumerate(self.rows):
+            yield [row[position] for position in self.positions]
+
+    def updateRow(self, values):
+        row = list(self.rows[self._index])
+        for position, value in zip(self.positions, values):
+            row[position] = value
+        self.rows[self._index] = tuple(row)
+
+
+class _MemoryEditor:
+    """arcpy.da.Editor stand-in; aborted operations and unsaved sessions restore the stored rows"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._session = None
+        self._operation = None
+
+    def _Snapshot(self):
+        return {path: list(rows) for path, rows in self.tables.items()}
+
+    def _Restore(self, snapshot):
+        # Rows are restored in place, since open cursors hold the row lists
+        for path, rows in snapshot.items():
+            self.tables[path][:] = rows
+
+    def startEditing(self, with_undo=True, multiuser_mode=True):
+        self._session = self._Snapshot()
+
+    def startOperation(self):
+        self._operation = self._Snapshot()
+
+    def stopOperation(self):
+        self._operation = None
+
+    def abortOperation(self):
+        self._Restore(self._operation)
+        self._operation = None
+
+    def stopEditing(self, save_changes=True):
+        if not save_changes:
+            self._Restore(self._session)
+        self._session = None
+
+
+class FeatureWriter:
+    """Base writer: opens one insert cursor per output and tracks rows/second"""
+
+    method = None
+    shape_field = None
+
+    def __init__(self, path, geometry_type, fields, spatial_ref, backend=None, metrics=None):
+        self.path = path
+        self.geometry_type = geometry_type
+        self.fields = list(fields)
+        self.spatial_ref = spatial_ref
+        self.backend = backend or ArcpyBackend()
+        self.metrics = metrics or profile_metrics.NULL_METRICS
+        self.rows = 0
+        self.writes = 0
+        self.largest_write = 0
+        self.elapsed = 0.0
+        self._cursor = None
+
+    def __enter__(self):
+        self._cursor = self.backend.InsertCursor(self.path, [self.shape_field] + self.fields)
+        self._cursor.__enter__()
+        self.metrics.Count("cursors")
+        return self
+
+    def __exit__(self, *exc_info):
+        cursor, self._cursor = self._cursor, None
+        return cursor.__exit__(*exc_info)
+
+    def Write(self, features, values):
+        """Insert every feature with its attribute values (one list per feature)"""
+        start = time.perf_counter()
+        for shape, feature_values in zip(self.Shapes(features), values):
+            self._cursor.insertRow([shape] + list(feature_values))
+        self.rows += len(features)
+        self.writes += 1
+        self.largest_write = max(self.largest_write, len(features))
+        self.elapsed += time.perf_counter() - start
+        self.metrics.Count("inserted", len(features))
+
+    def Shapes(self, features):
+        raise NotImplementedError
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def Summary(self):
+        """One-line throughput report for AddMessage"""
+        return (f"{self.path}: {self.rows} rows in {self.elapsed:.3f}s "
+                f"({self.rows_per_second:,.0f} rows/s, {self.method}, "
+                f"{self.writes} writes of up to {self.largest_write} rows)")
+
+
+class CursorWriter(FeatureWriter):
+    """Row-by-row writer building an arcpy geometry for every feature"""
+
+    method = WRITE_METHOD_CURSOR
+    shape_field = "SHAPE@"
+
+    def Shapes(self, features):
+        self.metrics.Count("geometries", len(features))
+        multipart = features.part_offsets is not None
+        for index in range(len(features)):
+            vertices = features.parts(index) if multipart else features.vertices(index)
+            yield self.backend.Geometry(self.geometry_type, vertices, self.spatial_ref)
+
+
+class WKBWriter(FeatureWriter):
+    """Bulk writer encoding every feature's WKB with NumPy, skipping arcpy geometry objects"""
+
+    method = WRITE_METHOD_WKB
+    shape_field = "SHAPE@WKB"
+
+    def Shapes(self, features):
+        return EncodeWKB(features, self.geometry_type)
+
+
+def EncodeWKB(features, geometry_type):
+    """Encode a FeatureArray as a list of little-endian WKB LineStrings, MultiLineStrings or single-ring Polygons"""
+    if features.part_offsets is None:
+        return _EncodeSinglePart(features.coords, features.offsets, _WKB_TYPES[geometry_type])
+    if geometry_type != "POLYLINE":
+        raise ValueError(f"Multipart {geometry_type} features are not supported")
+
+    # Every part is encoded as a LineString with the grouped encoder, then each feature's
+    # parts are joined behind a MultiLineString header
+    part_bounds = np.append(features.part_starts, features.vertex_count)
+    parts = _EncodeSinglePart(features.coords, part_bounds, _WKB_TYPES["POLYLINE"])
+    first_parts = np.searchsorted(features.part_starts, features.offsets).tolist()
+    return [
+        struct.pack("<BII", 1, _WKB_MULTILINESTRING, last - first) + b"".join(parts[first:last])
+        for first, last in zip(first_parts[:-1], first_parts[1:])
+    ]
+
+
+def _EncodeSinglePart(coords, offsets, wkb_type):
+    """WKB for the single-part shapes whose vertices are coords[offsets[i]:offsets[i + 1]]"""
+    counts = np.diff(offsets)
+    shapes = [None] * len(counts)
+
+    # Features with the same vertex count share one packed record layout, so each group
+    # is encoded with a single structured array fill and sliced into per-feature bytes
+    for count in np.unique(counts):
+        count = int(count)
+        indexes = np.flatnonzero(counts == count)
+        header = [("byte_order", "u1"), ("wkb_type", "<u4")]
+        if wkb_type == 3:
+            header.append(("ring_count", "<u4"))
+        record_dtype = np.dtype(header + [("point_count", "<u4"), ("xy", "<f8", (count, 2))])
+
+        records = np.empty(len(indexes), dtype=record_dtype)
+        records["byte_order"] = 1
+        records["wkb_type"] = wkb_type
+        if wkb_type == 3:
+            records["ring_count"] = 1
+        records["point_count"] = count
+        vertex_index = offsets[indexes][:, None] + np.arange(count)
+        records["xy"] = coords[vertex_index]
+
+        buffer = records.tobytes()
+        size = record_dtype.itemsize
+        for position, index in enumerate(indexes.tolist()):
+            shapes[index] = buffer[position * size:(position + 1) * size]
+    return shapes
+
+
+def DecodeWKB(shape):
+    """(n, 2) vertex arrays of each part of a WKB LineString, MultiLineString or single-ring Polygon
+
+    The arrays are read-only views on the WKB bytes.
+    """
+    wkb_type, count = struct.unpack_from("<II", shape, 1)
+    if wkb_type == _WKB_MULTILINESTRING:
+        parts, offset = [], 9
+        for _ in range(count):
+            (point_count,) = struct.unpack_from("<I", shape, offset + 5)
+            parts.append(np.frombuffer(shape, "<f8", 2 * point_count, offset + 9).reshape(-1, 2))
+            offset += 9 + 16 * point_count
+        return parts
+    if wkb_type == _WKB_TYPES["POLYGON"]:
+        (point_count,) = struct.unpack_from("<I", shape, 9)
+        return [np.frombuffer(shape, "<f8", 2 * point_count, 13).reshape(-1, 2)]
+    return [np.frombuffer(shape, "<f8", 2 * count, 9).reshape(-1, 2)]
+
+
+WRITER_CLASSES = {
+    WRITE_METHOD_CURSOR: CursorWriter,
+    WRITE_METHOD_WKB: WKBWriter,
+}
+
+
+# === Edit sessions ===
+def EditWorkspace(path):
+    """Geodatabase holding path (skipping any feature dataset), or its folder"""
+    parent = os.path.dirname(path)
+    probe = parent
+    while probe and os.path.dirname(probe) != probe:
+        if probe.lower().endswith((".gdb", ".sde")):
+            return probe
+        probe = os.path.dirname(probe)
+    return parent
+
+
+class EditSession:
+    """arcpy.da.Editor session on one workspace, committing one edit operation per Save
+
+    Versioned data is edited in multiuser mode; other data in single-user mode, where an
+    unsaved session can still be rolled back. Leaving the block commits the last
+    operation, or aborts it and discards every unsaved edit when an exception escapes.
+    """
+
+    def __init__(self, workspace, versioned=False, backend=None, metrics=None):
+        self.workspace = workspace
+        self.versioned = versioned
+        self.backend = backend or ArcpyBackend()
+        self.metrics = metrics or profile_metrics.NULL_METRICS
+        self.commits = 0
+        self._editor = None
+
+    def __enter__(self):
+        self._editor = self.backend.Editor(self.workspace)
+        self._Start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        editor, self._editor = self._editor, None
+        if exc_type is None:
+            editor.stopOperation()
+            editor.stopEditing(True)
+            self._Committed()
+        else:
+            editor.abortOperation()
+            editor.stopEditing(False)
+            self.metrics.Count("rollbacks")
+        return False
+
+    def _Start(self):
+        self._editor.startEditing(False, self.versioned)
+        self._editor.startOperation()
+
+    def _Committed(self):
+        self.commits += 1
+        self.metrics.Count("commits")
+
+    def Save(self):
+        """Commit the edits since the last save and start the next operation"""
+        self._editor.stopOperation()
+        self._editor.stopEditing(True)
+        self._Committed()
+        self._Start()
+
+
+def ParseWriteMethods(text, outputs, default=WRITE_METHOD_CURSOR):
+    """Parse the write method parameter into a method per output name
+
+    Accepts a single method for every output ("WKB") or per-output assignments
+    ("output_lines=WKB;bore_line=CURSOR"); unlisted outputs use default.
+    """
+    methods = {output: default for output in outputs}
+    for item in filter(None, (part.strip() for part in (text or "").split(";"))):
+        if "=" in item:
+            output, method = (part.strip() for part in item.split("=", 1))
+            if output not in methods:
+                raise ValueError(f"Unknown output '{output}' in write method '{item}'")
+            targets = [output]
+        else:
+            method, targets = item, list(methods)
+        method = method.upper()
+        if method not in WRITER_CLASSES:
+            raise ValueError(f"Unknown write method '{method}', expected one of {', '.join(WRITE_METHODS)}")
+        for output in targets:
+            methods[output] = method
+    return methods
+
+
+def OpenWriter(method, path, geometry_type, fields, spatial_ref, backend=None, metrics=None):
+    """Create the writer for method; use it as a context manager around Write calls"""
+    return WRITER_CLASSES[method](path, geometry_type, fields, spatial_ref, backend, metrics)
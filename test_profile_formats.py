@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import struct
+
+import numpy as np
+import pytest
+
+import profile_formats
+import profile_generator
+import profile_geometry
+
+EPSG = 3857
+
+
+@pytest.fixture
+def generate(profile_parameters):
+    """Run the two default profiles into paths with the EPSG spatial reference; returns (params, result)"""
+    def Generate(paths, **options):
+        params = profile_parameters(spatial_reference=EPSG, **paths, **options)
+        return params, profile_generator.generate_profile(params)
+    return Generate
+
+
+def ExpectedLines(params):
+    """Placed output_lines of every profile, as a list of part lists"""
+    template = profile_geometry.ProfileTemplate(float(params.input_length), params.row_number, 2, 3, 4, 5,
+                                                multipart=params.multipart)
+    features = []
+    for x, y in params.points:
+        placed = profile_geometry.TranslateFeatures(template.lines, x, y)
+        features.extend([part.tolist() for part in placed.parts(index)] for index in range(len(placed)))
+    return features
+
+
+# Bottom of the west depth polygon to the bottom of the east one, 2ft above each point
+EXPECTED_CONNECTORS = [[[950.0, 1999.0], [1050.0, 2000.0]], [[1450.0, 1999.0], [1550.0, 2000.0]]]
+
+WRITE_OPTIONS = [{"write_method": "CURSOR"}, {"write_method": "WKB"}, {"multipart": True},
+                 {"chunk_size": 5}, {"chunk_size": 5, "multipart": True}]
+
+
+# === GeoJSON ===
+@pytest.mark.parametrize("options", WRITE_OPTIONS)
+def test_geojson_read_back(tmp_path, generate, options):
+    paths = {output: str(tmp_path / f"{output}.geojson") for output in ("output_lines", "depth_polygons", "bore_line")}
+    params, result = generate(paths, **options)
+
+    collections = {output: json.loads(open(path, encoding="utf-8").read()) for output, path in paths.items()}
+    for output, collection in collections.items():
+        assert collection["type"] == "FeatureCollection"
+        assert collection["crs"]["properties"]["name"] == f"urn:ogc:def:crs:EPSG::{EPSG}"
+        assert len(collection["features"]) == result.rows[output]
+
+    connectors = collections["bore_line"]["features"]
+    assert [feature["geometry"]["coordinates"] for feature in connectors] == EXPECTED_CONNECTORS
+    assert [feature["properties"]["Line_Type"] for feature in connectors] == ["BORE_CONNECTION"] * 2
+
+    polygons = collections["depth_polygons"]["features"]
+    assert [feature["geometry"]["type"] for feature in polygons] == ["Polygon"] * 6
+    assert [feature["properties"]["PolyID"] for feature in polygons] == [1, 2, 0] * 2
+    assert polygons[2]["properties"]["Title"] == "Profile A"
+
+    lines = collections["output_lines"]["features"]
+    assert {feature["properties"]["Role"] for feature in lines} == {
+        "BORE_LINE", "TICK", "COMBINED", "GRID_HORIZONTAL", "GRID_VERTICAL"}
+    if not options.get("chunk_size"):
+        read = [[geometry["coordinates"]] if geometry["type"] == "LineString" else geometry["coordinates"]
+                for geometry in (feature["geometry"] for feature in lines)]
+        assert read == ExpectedLines(params)
+
+
+# === GeoPackage ===
+def ReadGeoPackageBlob(blob):
+    """(srs_id, envelope, parts) of a GeoPackage geometry blob holding a Polygon or (Multi)LineString"""
+    magic, version, flags = blob[:2], blob[2], blob[3]
+    assert (magic, version, flags) == (b"GP", 0, 0x03)
+    srs_id, min_x, max_x, min_y, max_y = struct.unpack_from("<i4d", blob, 4)
+    wkb = blob[40:]
+    byte_order, wkb_type, count = struct.unpack_from("<BII", wkb, 0)
+    assert byte_order == 1
+    parts, offset = [], 9
+    if wkb_type == 5:  # MultiLineString of LineStrings
+        for _ in range(count):
+            _, part_type, vertices = struct.unpack_from("<BII", wkb, offset)
+            assert part_type == 2
+            parts.append(np.frombuffer(wkb, "<f8", 2 * vertices, offset + 9).reshape(-1, 2).tolist())
+            offset += 9 + 16 * vertices
+    else:
+        assert wkb_type == 3 and count == 1
+        vertices = struct.unpack_from("<I", wkb, offset)[0]
+        parts.append(np.frombuffer(wkb, "<f8", 2 * vertices, offset + 4).reshape(-1, 2).tolist())
+    return srs_id, (min_x, min_y, max_x, max_y), parts
+
+
+@pytest.mark.parametrize("options", WRITE_OPTIONS)
+def test_geopackage_read_back(tmp_path, generate, options):
+    filename = tmp_path / "profiles.gpkg"
+    paths = {output: f"{filename}/{output}" for output in ("output_lines", "depth_polygons", "bore_line")}
+    params, result = generate(paths, **options)
+
+    connection = sqlite3.connect(filename)
+    assert connection.execute("PRAGMA application_id").fetchone()[0] == 0x47504B47
+    assert connection.execute("SELECT srs_id FROM gpkg_spatial_ref_sys WHERE srs_id = ?", (EPSG,)).fetchone()
+    columns = dict(connection.execute("SELECT table_name, geometry_type_name FROM gpkg_geometry_columns"))
+    assert columns == {"output_lines": "MULTILINESTRING", "depth_polygons": "POLYGON",
+                       "bore_line": "MULTILINESTRING"}
+
+    tables = {}
+    for output in paths:
+        rows = connection.execute(f'SELECT geom FROM "{output}" ORDER BY fid').fetchall()
+        assert len(rows) == result.rows[output]
+        tables[output] = [ReadGeoPackageBlob(blob) for (blob,) in rows]
+        # The contents extent covers every feature's envelope
+        min_x, min_y, max_x, max_y = connection.execute(
+            "SELECT min_x, min_y, max_x, max_y FROM gpkg_contents WHERE table_name = ?", (output,)).fetchone()
+        envelopes = np.array([envelope for _, envelope, _ in tables[output]])
+        assert (min_x, min_y, max_x, max_y) == (*envelopes[:, :2].min(0), *envelopes[:, 2:].max(0))
+
+    assert all(srs_id == EPSG for table in tables.values() for srs_id, _, _ in table)
+    assert [parts for _, _, parts in tables["bore_line"]] == [[line] for line in EXPECTED_CONNECTORS]
+    assert [len(parts[0]) for _, _, parts in tables["depth_polygons"]] == [5] * 6
+    if not options.get("chunk_size"):
+        assert [parts for _, _, parts in tables["output_lines"]] == ExpectedLines(params)
+
+    roles = connection.execute('SELECT DISTINCT Role FROM "output_lines"').fetchall()
+    assert {role for (role,) in roles} == {"BORE_LINE", "TICK", "COMBINED", "GRID_HORIZONTAL", "GRID_VERTICAL"}
+    connection.close()
+
+
+def test_geopackage_updates_attributes_in_place(tmp_path, generate):
+    filename = tmp_path / "profiles.gpkg"
+    paths = {output: f"{filename}/{output}" for output in ("output_lines", "depth_polygons", "bore_line")}
+    state = str(tmp_path / "state.json")
+    generate(paths, fingerprint_file=state)
+    _, result = generate(paths, fingerprint_file=state, title="Profile B")
+    assert result.actions["depth_polygons"] == "updated"
+
+    connection = sqlite3.connect(filename)
+    titles = connection.execute('SELECT Title FROM "depth_polygons" WHERE PolyID = 0').fetchall()
+    assert titles == [("Profile B",), ("Profile B",)]
+    connection.close()
+
+
+# === FlatGeobuf ===
+class FlatBufferTable:
+    """Read access to one FlatBuffers table, following the format's vtable layout"""
+
+    def __init__(self, buffer, position):
+        self.buffer = buffer
+        self.position = position
+        self.vtable = position - struct.unpack_from("<i", buffer, position)[0]
+
+    def Field(self, index):
+        vtable_size = struct.unpack_from("<H", self.buffer, self.vtable)[0]
+        if 4 + 2 * index >= vtable_size:
+            return None
+        offset = struct.unpack_from("<H", self.buffer, self.vtable + 4 + 2 * index)[0]
+        return self.position + offset if offset else None
+
+    def Scalar(self, index, value_format, default=0):
+        position = self.Field(index)
+        return default if position is None else struct.unpack_from(value_format, self.buffer, position)[0]
+
+    def Indirect(self, index):
+        position = self.Field(index)
+        return None if position is None else position + struct.unpack_from("<I", self.buffer, position)[0]
+
+    def String(self, index):
+        position = self.Indirect(index)
+        if position is None:
+            return None
+        length = struct.unpack_from("<I", self.buffer, position)[0]
+        return bytes(self.buffer[position + 4:position + 4 + length]).decode("utf-8")
+
+    def Vector(self, index, dtype):
+        position = self.Indirect(index)
+        if position is None:
+            return None
+        count = struct.unpack_from("<I", self.buffer, position)[0]
+        return np.frombuffer(self.buffer, dtype, count, position + 4)
+
+    def Table(self, index):
+        position = self.Indirect(index)
+        return None if position is None else FlatBufferTable(self.buffer, position)
+
+    def Tables(self, index):
+        position = self.Indirect(index)
+        count = struct.unpack_from("<I", self.buffer, position)[0]
+        slots = [position + 4 + 4 * number for number in range(count)]
+        return [FlatBufferTable(self.buffer, slot + struct.unpack_from("<I", self.buffer, slot)[0])
+                for slot in slots]
+
+
+def FlatBufferRoot(buffer):
+    return FlatBufferTable(buffer, struct.unpack_from("<I", buffer, 0)[0])
+
+
+def ReadFlatGeobuf(path):
+    """(header dict, features as (parts, properties)) of a FlatGeobuf file without a spatial index"""
+    data = open(path, "rb").read()
+    assert data[:8] == b"fgb\x03fgb\x00"
+    header_size = struct.unpack_from("<I", data, 8)[0]
+    header = FlatBufferRoot(data[12:12 + header_size])
+    columns = [(column.String(0), column.Scalar(1, "<B")) for column in header.Tables(7)]
+    crs = header.Table(10)
+    info = {
+        "name": header.String(0),
+        "envelope": header.Vector(1, "<f8").tolist(),
+        "geometry_type": header.Scalar(2, "<B"),
+        "columns": columns,
+        "features_count": header.Scalar(8, "<Q"),
+        "index_node_size": header.Scalar(9, "<H", 16),
+        "crs": (crs.String(0), crs.Scalar(1, "<i")) if crs else None,
+    }
+
+    features, position = [], 12 + header_size
+    while position < len(data):
+        size = struct.unpack_from("<I", data, position)[0]
+        feature = FlatBufferRoot(data[position + 4:position + 4 + size])
+        position += 4 + size
+
+        geometry = feature.Table(0)
+        xy = geometry.Vector(1, "<f8").reshape(-1, 2)
+        ends = geometry.Vector(0, "<u4")
+        bounds = [0] + (ends.tolist() if ends is not None else [len(xy)])
+        parts = [xy[start:stop].tolist() for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        properties, raw, offset = {}, feature.Vector(1, "<u1").tobytes(), 0
+        while offset < len(raw):
+            column = struct.unpack_from("<H", raw, offset)[0]
+            name, column_type = columns[column]
+            offset += 2
+            if column_type == 11:  # String
+                length = struct.unpack_from("<I", raw, offset)[0]
+                properties[name] = raw[offset + 4:offset + 4 + length].decode("utf-8")
+                offset += 4 + length
+            else:
+                value_format = {5: "<i", 3: "<h", 10: "<d", 9: "<f"}[column_type]
+                properties[name] = struct.unpack_from(value_format, raw, offset)[0]
+                offset += struct.calcsize(value_format)
+        features.append((parts, properties))
+    return info, features
+
+
+@pytest.mark.parametrize("options", WRITE_OPTIONS)
+def test_flatgeobuf_read_back(tmp_path, generate, options):
+    paths = {output: str(tmp_path / f"{output}.fgb") for output in ("output_lines", "depth_polygons", "bore_line")}
+    params, result = generate(paths, **options)
+
+    files = {output: ReadFlatGeobuf(path) for output, path in paths.items()}
+    for output, (info, features) in files.items():
+        assert info["name"] == output
+        assert info["features_count"] == len(features) == result.rows[output]
+        assert info["index_node_size"] == 0
+        assert info["crs"] == ("EPSG", EPSG)
+        coords = np.concatenate([np.array(part) for parts, _ in features for part in parts])
+        assert info["envelope"] == [*coords.min(0).tolist(), *coords.max(0).tolist()]
+
+    info, connectors = files["bore_line"]
+    assert info["geometry_type"] == 5
+    assert info["columns"] == [("Line_Type", 11), ("ProfileID", 5)]
+    assert [parts for parts, _ in connectors] == [[line] for line in EXPECTED_CONNECTORS]
+    assert [properties for _, properties in connectors] == [
+        {"Line_Type": "BORE_CONNECTION", "ProfileID": 1}, {"Line_Type": "BORE_CONNECTION", "ProfileID": 2}]
+
+    info, polygons = files["depth_polygons"]
+    assert info["geometry_type"] == 3
+    assert [properties["PolyID"] for _, properties in polygons] == [1, 2, 0] * 2
+    assert [properties.get("Depth_Type") for _, properties in polygons][:2] == ["OPEN", "HDD"]
+
+    _, lines = files["output_lines"]
+    if not options.get("chunk_size"):
+        assert [parts for parts, _ in lines] == ExpectedLines(params)
+    assert [properties["Role"] for _, properties in lines][:2] == ["BORE_LINE", "TICK"]
+
+
+def test_flatbuffer_builder_round_trip():
+    buffer = profile_formats.FlatBufferBuilder().Finish([
+        (0, "string", "name"),
+        (1, "[d]", [1.5, -2.5]),
+        (2, "B", 7),
+        (3, "table", [(1, "i", -42)]),
+        (4, "[table]", [[(0, "string", "a")], [(0, "string", "b")]]),
+        (5, "Q", 2 ** 40),
+        (6, "H", None),
+    ])
+    root = FlatBufferRoot(buffer)
+    assert root.String(0) == "name"
+    assert root.Vector(1, "<f8").tolist() == [1.5, -2.5]
+    assert root.Scalar(2, "<B") == 7
+    assert root.Table(3).Scalar(1, "<i") == -42 and root.Table(3).Field(0) is None
+    assert [table.String(0) for table in root.Tables(4)] == ["a", "b"]
+    assert root.Scalar(5, "<Q") == 2 ** 40
+    assert root.Field(6) is None
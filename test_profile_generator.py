@@ -0,0 +1,222 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+import profile_estimate
+import profile_generator
+import profile_writers
+
+import fake_arcpy
+
+
+def Origin(profile_parameters, **overrides):
+    return profile_generator.ProfileOrigin(1, 0.0, 0.0, profile_parameters(), overrides)
+
+
+# === Overrides ===
+def test_overrides_replace_and_convert_parameters(profile_parameters):
+    origin = Origin(profile_parameters, input_length="120", row_number=6.0, title="B", bearing="45")
+    assert (origin.input_length, origin.row_number, origin.title, origin.bearing) == (120.0, 6, "B", 45.0)
+    assert isinstance(origin.row_number, int)
+    assert origin.half_length == 60.0
+
+
+def test_empty_overrides_keep_the_tool_parameters(profile_parameters):
+    origin = Origin(profile_parameters, input_length=None, row_number="", title="")
+    assert (origin.input_length, origin.row_number, origin.title) == (100, 4, "Profile A")
+
+
+@pytest.mark.parametrize("name, value", [("row_number", "six"), ("input_length", "1O0"), ("bearing", "NE")])
+def test_invalid_override_names_the_profile_and_field(profile_parameters, name, value):
+    with pytest.raises(profile_generator.ProfileError, match=f"Profile 1: {name} override '{value}'"):
+        Origin(profile_parameters, **{name: value})
+
+
+def test_invalid_override_fails_generate_profile(profile_parameters):
+    points = [(0.0, 0.0), (500.0, 0.0, {"Row_Number": "many"})]
+    params = profile_parameters(points=points, backend=profile_writers.MemoryBackend(), output_lines="lines")
+    with pytest.raises(profile_generator.ProfileError, match="Profile 2: row_number"):
+        profile_generator.generate_profile(params)
+
+
+# === Validation ===
+def Problems(profile_parameters, **options):
+    return [name for name, _ in profile_generator.ValidateParameters(profile_parameters(**options))]
+
+
+def test_default_parameters_are_valid(profile_parameters):
+    assert Problems(profile_parameters) == []
+
+
+@pytest.mark.parametrize("options, parameter", [
+    ({"row_number": profile_generator.MAX_ROW_NUMBER + 1}, "row_number"),
+    ({"row_number": -1}, "row_number"),
+    ({"input_length": 0}, "input_length"),
+    ({"input_length": float("nan")}, "input_length"),
+    ({"input_length": float("inf")}, "input_length"),
+    ({"width_dimension1": 0}, "width_dimension1"),
+    ({"width_dimension2": -4}, "width_dimension2"),
+    ({"depth_dimension1": 0}, "depth_dimension1"),
+    ({"bearing": float("nan")}, "bearing"),
+    ({"bearing": float("inf")}, "bearing"),
+    ({"write_method": "FAST"}, "write_method"),
+    ({"write_method": "output_lines=WKB;contours=CURSOR"}, "write_method"),
+    ({"output_format": "KML"}, "output_format"),
+    ({"concurrency": "FIBERS"}, "concurrency"),
+    ({"chunk_size": -1}, "chunk_size"),
+    ({"edit_batch_size": -1}, "edit_batch_size"),
+    ({"edit_batch_size": 2, "concurrency": "THREADS"}, "edit_batch_size"),
+    ({"edit_batch_size": 2, "stage_in_memory": True}, "edit_batch_size"),
+    ({"output_format": "GEOJSON", "stage_in_memory": True}, "stage_in_memory"),
+    ({"output_lines": "lines.fgb", "concurrency": "PROCESSES", "spatial_reference": 3857}, "concurrency"),
+])
+def test_rejected_parameters(profile_parameters, options, parameter):
+    assert Problems(profile_parameters, **options) == [parameter]
+
+
+def test_rejected_parameters_fail_before_reading_points(profile_parameters):
+    # No points and no arcpy: the run must stop before loading anything
+    params = profile_parameters(points=None, input_points="missing", width_dimension1=0)
+    with pytest.raises(profile_generator.ProfileError, match="width_dimension1 must be greater than 0"):
+        profile_generator.generate_profile(params)
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"Row_Number": profile_generator.MAX_ROW_NUMBER + 1}, "row_number 1,000,001 exceeds"),
+    ({"Width_Dimension1": 0}, "width_dimension1 must be greater than 0"),
+    ({"Depth_Dimension2": -2}, "depth_dimension2 must be greater than 0"),
+    ({"Input_Length": float("inf")}, "input_length must be a finite length"),
+    ({"Input_Length": float("nan")}, "input_length must be a finite length"),
+    ({"Bearing": float("inf")}, "bearing must be a finite angle"),
+])
+def test_rejected_overrides_name_the_profile(profile_parameters, overrides, message):
+    backend = profile_writers.MemoryBackend()
+    params = profile_parameters(points=[(0.0, 0.0), (500.0, 0.0, overrides)], backend=backend, output_lines="lines")
+    with pytest.raises(profile_generator.ProfileError, match=f"Profile 2: {message}"):
+        profile_generator.generate_profile(params)
+    assert backend.tables == {}
+
+
+def test_runs_over_max_features_are_rejected(profile_parameters, monkeypatch):
+    # Two profiles of 12 lines, 3 polygons, 1 connector and 4 cells
+    backend = profile_writers.MemoryBackend()
+    params = profile_parameters(backend=backend, output_lines="lines", depth_polygons="depths", bore_line="bore",
+                                grid_cells="cells")
+    monkeypatch.setattr(profile_generator, "MAX_FEATURES", 2 * 20 - 1)
+    with pytest.raises(profile_generator.ProfileError, match="would write 40 features, more than the maximum of 39"):
+        profile_generator.generate_profile(params)
+    assert backend.tables == {}
+
+    monkeypatch.setattr(profile_generator, "MAX_FEATURES", 2 * 20)
+    assert sum(profile_generator.generate_profile(params).rows.values()) == 40
+
+
+# === Estimates ===
+OUTPUT_PATHS = {"output_lines": "lines", "depth_polygons": "depths", "bore_line": "bore", "grid_cells": "cells"}
+
+
+def test_dry_run_writes_nothing(profile_parameters):
+    backend = profile_writers.MemoryBackend()
+    result = profile_generator.generate_profile(profile_parameters(backend=backend, dry_run=True, **OUTPUT_PATHS))
+    assert backend.tables == backend.schemas == {}
+    assert result.rows == {}
+    assert result.estimate["features"] == 2 * 20
+    assert result.messages[-1].startswith("Dry run: nothing written")
+
+
+def Vertices(shape):
+    """Every (x, y) of a MemoryBackend shape, a vertex list or a list of parts"""
+    return [vertex for part in shape for vertex in part] if isinstance(shape[0], list) else shape
+
+
+@pytest.mark.parametrize("multipart", [False, True])
+@pytest.mark.parametrize("chunk_size", [0, 1, 3, 7])
+@pytest.mark.parametrize("per_row_verticals", [False, True])
+def test_estimate_matches_written_rows(profile_parameters, multipart, chunk_size, per_row_verticals):
+    backend = profile_writers.MemoryBackend()
+    # Odd, even and overridden row counts, with one rotated profile
+    points = [(0.0, 0.0), (500.0, 0.0, {"Row_Number": 7}), (0.0, 900.0, {"Row_Number": 2, "Bearing": 30.0})]
+    params = profile_parameters(points=points, backend=backend, multipart=multipart, chunk_size=chunk_size,
+                                per_row_verticals=per_row_verticals, **OUTPUT_PATHS)
+    estimate = profile_generator.generate_profile(dataclasses.replace(params, dry_run=True)).estimate
+    result = profile_generator.generate_profile(params)
+
+    for output, path in OUTPUT_PATHS.items():
+        rows = backend.tables[path]
+        assert estimate["outputs"][output]["features"] == result.rows[output] == len(rows)
+        assert estimate["outputs"][output]["vertices"] == sum(len(Vertices(row[0])) for row in rows)
+
+    # The estimated extent is the envelope of every written vertex
+    coords = np.array([vertex for rows in backend.tables.values() for row in rows for vertex in Vertices(row[0])])
+    np.testing.assert_allclose(estimate["extent"], [*coords.min(0), *coords.max(0)], atol=1e-9)
+
+
+def test_profile_counts():
+    counts = profile_estimate.ProfileCounts(4)
+    # Bore line, 4 ticks, combined line, 4 rules and one rail per side
+    assert counts["output_lines"] == (12, 3 + 2 * 11)
+    assert counts["grid_cells"] == (4, 20)
+    assert profile_estimate.ProfileCounts(4, per_row_verticals=True)["output_lines"][0] == 6 + 4 + 8
+    # One feature per group: bore line, ticks, combined line, rules, west rails, east rails
+    assert profile_estimate.ProfileCounts(4, multipart=True)["output_lines"][0] == 6
+    # Groups straddling a chunk boundary are split: parts 1|4|1|4|1|1 in chunks of 3
+    assert profile_estimate.ProfileCounts(4, multipart=True, chunk_size=3)["output_lines"][0] == 8
+    assert profile_estimate.ProfileCounts(0)["output_lines"] == (6, 13)
+
+
+def test_profile_extents_rotate_with_bearing(profile_parameters):
+    params = profile_parameters()
+    east = profile_generator.ProfileOrigin(1, 10.0, 20.0, params, {})
+    north = profile_generator.ProfileOrigin(2, 10.0, 20.0, params, {"bearing": 0.0})
+    extents = profile_estimate.ProfileExtents([east, north])
+    # 100ft bore, west width 5 and east width 4 plus 1ft ticks; 2 rows above and 2 below,
+    # deeper than the 3ft depth rectangles hanging from the top row
+    np.testing.assert_allclose(extents[0], [10 - 56, 20 - 2, 10 + 55, 20 + 2])
+    # Rotated so the bore runs south to north
+    np.testing.assert_allclose(extents[1], [10 - 2, 20 - 56, 10 + 2, 20 + 55], atol=1e-9)
+
+
+# === Concurrency ===
+def test_threads_write_the_same_rows_as_a_sequential_run(profile_parameters):
+    rows = {}
+    for concurrency in ("", "THREADS"):
+        backend = profile_writers.MemoryBackend()
+        profile_generator.generate_profile(profile_parameters(backend=backend, concurrency=concurrency,
+                                                              **OUTPUT_PATHS))
+        rows[concurrency] = backend.tables
+    assert rows["THREADS"] == rows[""]
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"backend": profile_writers.MemoryBackend(), "spatial_reference": 3857}, "cannot use a custom backend"),
+    ({}, "needs a spatial_reference"),
+])
+def test_processes_are_rejected_before_writing(profile_parameters, options, message):
+    params = profile_parameters(concurrency="processes", **OUTPUT_PATHS, **options)
+    assert Problems(profile_parameters, concurrency="processes", **OUTPUT_PATHS, **options) == ["concurrency"]
+    with pytest.raises(profile_generator.ProfileError, match=message):
+        profile_generator.generate_profile(params)
+
+
+# === Staging ===
+GDB_OUTPUTS = {output: f"/data/bores.gdb/{output}" for output in OUTPUT_PATHS}
+
+
+def test_staged_outputs_are_copied_to_their_final_paths(profile_parameters, arcpy):
+    result = profile_generator.generate_profile(profile_parameters(stage_in_memory=True, spatial_reference=3857,
+                                                                   **GDB_OUTPUTS))
+    # Every output is written in the memory workspace, copied once and the staged copy released
+    assert fake_arcpy.COUNTS["CopyFeatures"] == fake_arcpy.COUNTS["Delete"] == len(GDB_OUTPUTS)
+    assert not [path for path in fake_arcpy.WORKSPACE if path.startswith(profile_generator.MEMORY_WORKSPACE)]
+    for output, path in GDB_OUTPUTS.items():
+        assert len(fake_arcpy.WORKSPACE[path].rows) == result.rows[output]
+    assert result.rows["output_lines"] == 2 * 12
+    assert "Copied staged outputs from the memory workspace" in result.messages
+    assert "copy" in result.metrics.stages
+
+
+def test_unstaged_outputs_are_written_in_place(profile_parameters, arcpy):
+    profile_generator.generate_profile(profile_parameters(spatial_reference=3857, **GDB_OUTPUTS))
+    assert fake_arcpy.COUNTS["CopyFeatures"] == 0
+    assert all(fake_arcpy.WORKSPACE[path].rows for path in GDB_OUTPUTS.values())
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+import profile_geometry as geometry
+
+# input_length, row_number, depth_dimension1, depth_dimension2, width_dimension1, width_dimension2
+DIMENSIONS = (100.0, 6, 2, 3, 4, 5)
+
+
+def Roles(features):
+    return features.attributes["Role"].tolist()
+
+
+def test_template_feature_counts():
+    layout = geometry.ProfileTemplate(*DIMENSIONS)
+    # Bore line, 4 ticks, combined line, 6 rules and one rail per side
+    assert len(layout.lines) == 1 + 4 + 1 + 6 + 2
+    assert len(layout.polygons) == 3
+    assert len(layout.connector) == 1
+    assert len(layout.cells) == 0
+    assert len(geometry.ProfileTemplate(*DIMENSIONS, cells=True).cells) == 6
+
+    per_row = geometry.ProfileTemplate(*DIMENSIONS, per_row_verticals=True)
+    assert len(per_row.lines) == 1 + 4 + 1 + 6 + 12
+
+
+def test_template_roles_and_poly_ids():
+    lines = geometry.ProfileTemplate(*DIMENSIONS).lines
+    assert Roles(lines) == ([geometry.ROLE_BORE_LINE] + [geometry.ROLE_TICK] * 4 + [geometry.ROLE_COMBINED]
+                            + [geometry.ROLE_GRID_HORIZONTAL] * 6 + [geometry.ROLE_GRID_VERTICAL] * 2)
+    assert not set(Roles(lines)) & set(geometry.CONSTRUCTION_ROLES)
+    assert lines.attributes["PolyID"].tolist() == [geometry.POLY_ID_NONE] * 12 + [geometry.POLY_ID_WEST,
+                                                                                   geometry.POLY_ID_EAST]
+
+    polygons = geometry.ProfileTemplate(*DIMENSIONS).polygons
+    assert Roles(polygons) == [geometry.ROLE_DEPTH, geometry.ROLE_DEPTH, geometry.ROLE_BACKGROUND]
+    assert polygons.attributes["PolyID"].tolist() == [geometry.POLY_ID_WEST, geometry.POLY_ID_EAST,
+                                                      geometry.POLY_ID_BACKGROUND]
+
+
+def test_template_coordinates():
+    layout = geometry.ProfileTemplate(*DIMENSIONS)
+    np.testing.assert_array_equal(layout.lines.vertices(0), [[-50, 0], [0, 0], [50, 0]])
+
+    # Combined line spans the widths plus the 1ft ticks: west 5 + 1, east 4 + 1
+    np.testing.assert_array_equal(layout.lines.vertices(5), [[-56, 0], [55, 0]])
+
+    # Three rules above the bore line, then three below
+    rule_y = [layout.lines.vertices(index)[0, 1] for index in range(6, 12)]
+    assert rule_y == [1, 2, 3, -1, -2, -3]
+
+    # Depth rectangles hang from the top row (3ft above the bore line)
+    west, east, background = (layout.polygons.vertices(index) for index in range(3))
+    np.testing.assert_array_equal(west, [[-55, 3], [-50, 3], [-50, 0], [-55, 0], [-55, 3]])
+    np.testing.assert_array_equal(east, [[50, 3], [54, 3], [54, 1], [50, 1], [50, 3]])
+    np.testing.assert_array_equal(background[[0, 2]], [[-56, 3], [55, -3]])
+    np.testing.assert_array_equal(layout.connector.vertices(0), [[-50, 0], [50, 1]])
+
+    # Cells from the top row down
+    cells = geometry.ProfileTemplate(*DIMENSIONS, cells=True).cells
+    assert cells.coords[cells.offsets[:-1], 1].tolist() == [3, 2, 1, 0, -1, -2]
+    np.testing.assert_array_equal(cells.vertices(0), [[-56, 3], [55, 3], [55, 2], [-56, 2], [-56, 3]])
+
+
+def test_cells_are_only_built_when_requested():
+    without_cells = geometry.ProfileTemplate(*DIMENSIONS)
+    with_cells = geometry.ProfileTemplate(*DIMENSIONS, cells=True)
+    assert with_cells is not without_cells
+    assert without_cells.nbytes < with_cells.nbytes
+    np.testing.assert_array_equal(without_cells.lines.coords, with_cells.lines.coords)
+    assert geometry.ProfileTemplate.cache_info().currsize == 2
+    assert len(geometry.ProfileLayoutCoordinates(0.0, 0.0, *DIMENSIONS, include_cells=False).cells) == 0
+
+
+def test_template_is_cached_and_read_only():
+    layout = geometry.ProfileTemplate(*DIMENSIONS)
+    assert geometry.ProfileTemplate(*DIMENSIONS) is layout
+    with pytest.raises(ValueError):
+        layout.lines.coords[0, 0] = 1.0
+
+
+def test_translate_features():
+    lines = geometry.ProfileTemplate(*DIMENSIONS).lines
+    placed = geometry.TranslateFeatures(lines, 1000.0, 2000.0)
+    np.testing.assert_array_equal(placed.coords, lines.coords + (1000.0, 2000.0))
+    assert placed.offsets is lines.offsets
+
+
+def test_multipart_template_merges_groups():
+    lines = geometry.ProfileTemplate(*DIMENSIONS, multipart=True).lines
+    assert Roles(lines) == [geometry.ROLE_BORE_LINE, geometry.ROLE_TICK, geometry.ROLE_COMBINED,
+                            geometry.ROLE_GRID_HORIZONTAL, geometry.ROLE_GRID_VERTICAL,
+                            geometry.ROLE_GRID_VERTICAL]
+    assert [len(lines.parts(index)) for index in range(len(lines))] == [1, 4, 1, 6, 1, 1]
+
+
+@pytest.mark.parametrize("per_row_verticals", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 4, 7, 10000])
+def test_line_chunks_match_template(per_row_verticals, chunk_size):
+    input_length, row_number, _, _, width_dimension1, width_dimension2 = DIMENSIONS
+    chunks = list(geometry.ProfileLineChunks(0.0, 0.0, input_length, row_number, width_dimension1,
+                                             width_dimension2, per_row_verticals, chunk_size))
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+
+    streamed = geometry.Concatenate(chunks)
+    eager = geometry.ProfileTemplate(*DIMENSIONS, per_row_verticals=per_row_verticals).lines
+    np.testing.assert_array_equal(streamed.coords, eager.coords)
+    np.testing.assert_array_equal(streamed.offsets, eager.offsets)
+    np.testing.assert_array_equal(streamed.attributes, eager.attributes)
+
+
+@pytest.mark.parametrize("bearing, expected", [
+    (90.0, (1.0, 0.0)),    # East: the local frame itself
+    (0.0, (0.0, 1.0)),     # North
+    (180.0, (0.0, -1.0)),  # South
+    (270.0, (-1.0, 0.0)),  # West
+    (45.0, (np.sqrt(0.5), np.sqrt(0.5))),
+])
+def test_bearing_matrix_rotates_bore_axis(bearing, expected):
+    np.testing.assert_allclose(np.array([1.0, 0.0]) @ geometry.BearingMatrix(bearing), expected, atol=1e-12)
+
+
+def test_place_features_rotates_then_translates():
+    lines = geometry.ProfileTemplate(*DIMENSIONS).lines
+    placed = geometry.PlaceFeatures(lines, 10.0, 20.0, bearing=0.0)
+    # Bore axis runs south to north; the rows above the bore line move to the west
+    np.testing.assert_allclose(placed.vertices(0), [[10, -30], [10, 20], [10, 70]], atol=1e-12)
+    np.testing.assert_allclose(placed.vertices(6)[0], [9, -36], atol=1e-12)
+    assert geometry.PlaceFeatures(lines, 10.0, 20.0, bearing=None).coords.tolist() == \
+        geometry.TranslateFeatures(lines, 10.0, 20.0).coords.tolist()
+
+
+def test_roles_are_byte_codes_with_names():
+    lines = geometry.ProfileTemplate(*DIMENSIONS).lines
+    assert lines.attributes.dtype["Role"].itemsize == 1
+    assert [geometry.ROLE_NAMES[role] for role in Roles(lines)[:3]] == ["BORE_LINE", "TICK", "TICK"]
+    assert geometry.ROLE_NAMES[geometry.ROLE_GRID_CELL] == "GRID_CELL"
+
+
+def test_template_cache_is_bounded_by_bytes():
+    cache = geometry.TemplateCache(maxsize=128, max_bytes=2 * geometry.ProfileTemplate(*DIMENSIONS).nbytes)
+    build = lambda rows: lambda: geometry.ProfileLayoutCoordinates(
+        0.0, 0.0, 100.0, rows, 2, 3, 4, 5, include_cells=False)
+    for key in range(3):
+        cache.Get(key, build(6))
+    info = cache.cache_info()
+    assert info.currsize == 2 and info.nbytes <= cache.max_bytes
+    assert cache.Get(2, build(6)) is cache.Get(2, build(6))
+
+    # A layout larger than the whole budget is returned but never cached
+    large = cache.Get("large", build(1000))
+    assert len(large.lines) > 1000
+    assert cache.cache_info().currsize == 2
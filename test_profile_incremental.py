@@ -0,0 +1,95 @@
+import pytest
+
+import profile_generator
+import profile_incremental
+import profile_writers
+
+COMPONENTS = sorted({name for components in (profile_incremental.GEOMETRY_COMPONENTS,
+                                             profile_incremental.ATTRIBUTE_COMPONENTS)
+                     for names in components.values() for name in names})
+
+
+def Origins(profile_parameters, **changes):
+    """ProfileOrigins of the two default profiles, the second with changes applied"""
+    params = profile_parameters()
+    origins = [profile_generator.ProfileOrigin(profile_id, x, y, params, {})
+               for profile_id, (x, y) in enumerate(params.points, start=1)]
+    for name, value in changes.items():
+        setattr(origins[1], name, value)
+    return origins
+
+
+def Changed(origin, name):
+    """A different value for one component of origin"""
+    value = getattr(origin, name)
+    if value is None:
+        return 45.0
+    return value + "x" if isinstance(value, str) else value + 1
+
+
+# === Fingerprints ===
+@pytest.mark.parametrize("output", profile_incremental.GEOMETRY_COMPONENTS)
+@pytest.mark.parametrize("name", COMPONENTS)
+def test_each_component_changes_only_its_digest(profile_parameters, output, name):
+    origins = Origins(profile_parameters)
+    changed = Origins(profile_parameters, **{name: Changed(origins[1], name)})
+    before = profile_incremental.OutputFingerprint(output, origins, None)
+    after = profile_incremental.OutputFingerprint(output, changed, None)
+    assert (before["geometry"] != after["geometry"]) == (name in profile_incremental.GEOMETRY_COMPONENTS[output])
+    assert (before["attributes"] != after["attributes"]) == (name in profile_incremental.ATTRIBUTE_COMPONENTS[output])
+
+
+@pytest.mark.parametrize("output", profile_incremental.GEOMETRY_COMPONENTS)
+def test_settings_change_only_the_output_lines_geometry(profile_parameters, output):
+    origins = Origins(profile_parameters)
+    fingerprint = profile_incremental.OutputFingerprint(output, origins, None)
+    for settings in ({"per_row_verticals": True}, {"multipart": True}):
+        changed = profile_incremental.OutputFingerprint(output, origins, None, **settings)
+        assert (changed["geometry"] != fingerprint["geometry"]) == (output == "output_lines")
+        assert changed["attributes"] == fingerprint["attributes"]
+    assert profile_incremental.OutputFingerprint(output, origins, 3857)["geometry"] != fingerprint["geometry"]
+
+
+def test_chunk_size_only_counts_with_multipart(profile_parameters):
+    origins = Origins(profile_parameters)
+
+    def Geometry(**settings):
+        return profile_incremental.OutputFingerprint("output_lines", origins, None, **settings)["geometry"]
+
+    assert Geometry(chunk_size=3) == Geometry()
+    assert Geometry(multipart=True, chunk_size=3) != Geometry(multipart=True)
+    assert Geometry(multipart=True, chunk_size=3) != Geometry(multipart=True, chunk_size=4)
+
+
+# === Actions ===
+FINGERPRINT = {"geometry": "g", "attributes": "a"}
+
+
+@pytest.mark.parametrize("previous, exists, action", [
+    (FINGERPRINT, True, profile_incremental.ACTION_UNCHANGED),
+    ({"geometry": "g", "attributes": "b"}, True, profile_incremental.ACTION_UPDATE),
+    ({"geometry": "h", "attributes": "a"}, True, profile_incremental.ACTION_REBUILD),
+    ({"geometry": "h", "attributes": "b"}, True, profile_incremental.ACTION_REBUILD),
+    (FINGERPRINT, False, profile_incremental.ACTION_REBUILD),
+    (None, True, profile_incremental.ACTION_REBUILD),
+    ({}, True, profile_incremental.ACTION_REBUILD),
+])
+def test_plan_action(previous, exists, action):
+    assert profile_incremental.PlanAction(FINGERPRINT, previous, exists) == action
+
+
+def test_multipart_chunk_size_change_rebuilds_output_lines(profile_parameters, tmp_path):
+    backend = profile_writers.MemoryBackend()
+
+    def Run(**options):
+        params = profile_parameters(backend=backend, output_lines="lines", depth_polygons="depths",
+                                    fingerprint_file=str(tmp_path / "state.json"), multipart=True, **options)
+        return profile_generator.generate_profile(params)
+
+    assert Run().rows["output_lines"] == 2 * 6
+    result = Run(chunk_size=3)
+    assert result.actions == {"output_lines": profile_incremental.ACTION_REBUILD,
+                              "depth_polygons": profile_incremental.ACTION_UNCHANGED}
+    # Groups are split at the chunk boundaries: 1|4|1|4|1|1 lines in chunks of 3
+    assert result.rows["output_lines"] == len(backend.tables["lines"]) == 2 * 8
+    assert Run(chunk_size=3).actions["output_lines"] == profile_incremental.ACTION_UNCHANGED
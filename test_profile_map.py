@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import profile_generator
+import profile_map
+
+import fake_arcpy
+
+WORKSPACE = "/data/bores.gdb"
+OUTPUTS = {"output_lines": f"{WORKSPACE}/lines", "depth_polygons": f"{WORKSPACE}/depths",
+           "bore_line": f"{WORKSPACE}/bore"}
+
+
+@pytest.fixture
+def project(arcpy, monkeypatch):
+    """fake_arcpy with an open project, as if running inside ArcGIS Pro"""
+    fake_arcpy.OpenProject()
+    monkeypatch.setattr(profile_map, "InsideArcGISPro", lambda: True)
+    profile_map._LayerFile.cache_clear()
+    return arcpy
+
+
+@pytest.fixture
+def generate(project, profile_parameters):
+    """Run the default profiles into OUTPUTS with add_to_map on"""
+    def Generate(**options):
+        params = profile_parameters(**{"spatial_reference": project.SpatialReference(3857), "add_to_map": True,
+                                       **OUTPUTS, **options})
+        return profile_generator.generate_profile(params)
+    return Generate
+
+
+def MapLayers():
+    return [(layer.name, None if layer.isGroupLayer else layer.dataSource)
+            for layer in fake_arcpy.PROJECT.activeMap.listLayers()]
+
+
+def test_outputs_are_added_to_one_group(generate):
+    generate()
+    assert MapLayers() == [(profile_map.GROUP_LAYER_NAME, None), ("Bore Line", OUTPUTS["bore_line"]),
+                           ("Output Lines", OUTPUTS["output_lines"]), ("Depth Polygons", OUTPUTS["depth_polygons"])]
+    assert fake_arcpy.COUNTS["createGroupLayer"] == 1
+    assert fake_arcpy.COUNTS["addDataFromPath"] == 0
+
+
+def test_existing_layers_are_reused_and_refreshed(generate, tmp_path):
+    state = str(tmp_path / "state.json")
+    generate(fingerprint_file=state)
+    layers = MapLayers()
+    fake_arcpy.COUNTS.clear()
+
+    # Unchanged outputs leave the map alone
+    result = generate(fingerprint_file=state)
+    assert MapLayers() == layers
+    assert not [message for message in result.messages if message.endswith(" in map")
+                or message.endswith(" to map")]
+    assert fake_arcpy.COUNTS["setDefinition"] == 0
+
+    # A rebuilt output refreshes its layer instead of adding another one
+    result = generate(fingerprint_file=state, input_length=120)
+    assert MapLayers() == layers
+    assert fake_arcpy.COUNTS["addLayerToGroup"] == fake_arcpy.COUNTS["createGroupLayer"] == 0
+    assert fake_arcpy.COUNTS["setDefinition"] == 3
+    assert "Refreshed Output Lines in map" in result.messages
+
+
+def test_template_layers_are_pointed_at_the_outputs(generate, tmp_path):
+    template = tmp_path / "profile.lyrx"
+    template.write_text(json.dumps({"type": "CIMLayerDocument", "layerDefinitions": [
+        {"type": "CIMGroupLayer", "name": profile_map.GROUP_LAYER_NAME},
+        {"type": "CIMFeatureLayer", "name": "Output Lines"},
+        {"type": "CIMFeatureLayer", "name": "Grid Cells"},
+    ]}))
+    cells = "/data/bores.sde/cells"
+    generate(grid_cells=cells, layer_template=str(template))
+    generate(grid_cells=cells, layer_template=str(template))
+
+    layers = {layer.name: layer for layer in fake_arcpy.PROJECT.activeMap.listLayers()}
+    assert layers["Grid Cells"].connectionProperties == {
+        "dataset": "cells", "workspace_factory": "SDE", "connection_info": {"database": "/data/bores.sde"}}
+    assert layers["Output Lines"].connectionProperties["workspace_factory"] == "File Geodatabase"
+    assert layers["Output Lines"].dataSource == OUTPUTS["output_lines"]
+    assert fake_arcpy.COUNTS["updateConnectionProperties"] == 2
+    # The template is read once for both runs
+    assert fake_arcpy.COUNTS["LayerFile"] == 1
+
+
+def test_skipped_outside_arcgis_pro_and_when_turned_off(generate, monkeypatch):
+    generate(add_to_map=False)
+    assert MapLayers() == []
+
+    monkeypatch.setattr(profile_map, "InsideArcGISPro", lambda: False)
+    result = generate()
+    assert MapLayers() == []
+    assert "map" not in result.metrics.stages
@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+import pytest
+
+import profile_worker
+
+JOB = {"points": [[1000.0, 2000.0], [1500.0, 2000.0, {"Row_Number": 6}]], "spatial_reference": 3857,
+       "input_length": 100, "row_number": 4, "depth_type1": "HDD", "depth_type2": "OPEN", "depth_dimension1": 2,
+       "depth_dimension2": 3, "width_dimension1": 4, "width_dimension2": 5, "title": "Profile A"}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """Queue directory for a --once --no-arcpy worker that cannot import arcpy"""
+    monkeypatch.setitem(sys.modules, "arcpy", None)
+    return tmp_path / "queue"
+
+
+def Submit(queue, name, **job):
+    queue.mkdir(exist_ok=True)
+    (queue / name).write_text(json.dumps(job))
+
+
+def RunOnce(queue, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["profile_worker.py", str(queue), "--once", "--no-arcpy"])
+    profile_worker.main()
+
+
+def Report(queue, name):
+    return json.loads((queue / "results" / name).read_text())
+
+
+def test_geojson_job_without_arcpy(queue, tmp_path, monkeypatch):
+    outputs = {output: str(tmp_path / f"{output}.geojson") for output in ("output_lines", "depth_polygons", "bore_line")}
+    Submit(queue, "a.json", id="bores-a", **JOB, **outputs)
+    RunOnce(queue, monkeypatch)
+
+    report = Report(queue, "a.json")
+    assert (report["id"], report["status"], report["profile_count"]) == ("bores-a", "succeeded", 2)
+    # Bore line, ticks, combined line, one rule per row and two rails for each profile
+    assert report["rows"] == {"output_lines": (6 + 4 + 2) + (6 + 6 + 2), "depth_polygons": 6, "bore_line": 2}
+    assert report["estimate"]["features"] == 26 + 6 + 2
+    for output, path in outputs.items():
+        assert report["outputs"][output] == path
+        with open(path, encoding="utf-8") as collection:
+            assert len(json.load(collection)["features"]) == report["rows"][output]
+    assert os.listdir(queue / "done") == ["a.json"]
+    assert not os.listdir(queue / "running") and not os.listdir(queue / "failed")
+
+
+def test_failed_job_is_reported_and_the_queue_continues(queue, tmp_path, monkeypatch, capsys):
+    outputs = {"output_lines": str(tmp_path / "lines.fgb"), "depth_polygons": str(tmp_path / "depths.fgb"),
+               "bore_line": str(tmp_path / "bore.fgb")}
+    Submit(queue, "1-invalid.json", **{**JOB, "width_dimension1": 0}, **outputs)
+    Submit(queue, "2-unknown.json", **JOB, **outputs, colour="red")
+    Submit(queue, "3-broken.json")
+    (queue / "3-broken.json").write_text("{not json")
+    Submit(queue, "4-valid.json", **JOB, **outputs)
+    RunOnce(queue, monkeypatch)
+
+    invalid = Report(queue, "1-invalid.json")
+    assert invalid["status"] == "failed"
+    assert invalid["error"] == "width_dimension1 must be greater than 0 (got 0)"
+    assert "ProfileError" in invalid["traceback"]
+    assert Report(queue, "2-unknown.json")["error"] == "Unknown job parameter(s): colour"
+    broken = Report(queue, "3-broken.json")
+    assert broken["status"] == "failed" and "id" not in broken
+
+    # The jobs after the failures still run
+    assert Report(queue, "4-valid.json")["status"] == "succeeded"
+    assert os.path.exists(outputs["output_lines"])
+    assert sorted(os.listdir(queue / "failed")) == ["1-invalid.json", "2-unknown.json", "3-broken.json"]
+    assert os.listdir(queue / "done") == ["4-valid.json"]
+    assert "Running without arcpy" in capsys.readouterr().out
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pytest
+
+import profile_generator
+import profile_geometry
+import profile_metrics
+import profile_writers
+
+import fake_arcpy
+
+WORKSPACE = "C:/data/bores.gdb"
+OUTPUTS = {output: f"{WORKSPACE}/{output}" for output in ("output_lines", "depth_polygons", "bore_line")}
+
+
+class RecordingBackend(profile_writers.MemoryBackend):
+    """MemoryBackend recording every editor commit and rollback, optionally failing on an insert"""
+
+    def __init__(self, fail_path=None, fail_after=0):
+        super().__init__()
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_path = fail_path
+        self.fail_after = fail_after
+
+    def Editor(self, workspace):
+        editor = super().Editor(workspace)
+        stop_editing = editor.stopEditing
+
+        def StopEditing(save_changes=True):
+            if save_changes:
+                self.commits += 1
+            else:
+                self.rollbacks += 1
+            stop_editing(save_changes)
+
+        editor.stopEditing = StopEditing
+        return editor
+
+    def InsertCursor(self, path, fields):
+        cursor = super().InsertCursor(path, fields)
+        if path == self.fail_path:
+            insert_row = cursor.insertRow
+
+            def InsertRow(row):
+                if len(cursor.rows) >= self.fail_after:
+                    raise RuntimeError("insert failed")
+                insert_row(row)
+
+            cursor.insertRow = InsertRow
+        return cursor
+
+
+@pytest.fixture
+def parameters(profile_parameters):
+    """Five profiles written to OUTPUTS through backend"""
+    def Parameters(backend, **options):
+        points = [(index * 500.0, 0.0) for index in range(5)]
+        return profile_parameters(points=points, backend=backend, **OUTPUTS, **options)
+    return Parameters
+
+
+# === MemoryBackend ===
+def test_memory_backend_insert_update_and_copy():
+    backend = profile_writers.MemoryBackend()
+    backend.CreateFeatureClass("a", "POLYLINE", [("Name", "TEXT", 10), ("Value", "LONG", None)], None)
+    with backend.InsertCursor("a", ["SHAPE@", "Name", "Value"]) as cursor:
+        cursor.insertRow(["shape", "x", 1])
+        cursor.insertRow(["shape", "y", 2])
+    with backend.UpdateCursor("a", ["Value"]) as cursor:
+        for (value,) in cursor:
+            cursor.updateRow([value * 10])
+    assert backend.tables["a"] == [("shape", "x", 10), ("shape", "y", 20)]
+
+    backend.CopyFeatures("a", "b")
+    backend.Delete("a")
+    assert not backend.Exists("a") and backend.tables["b"] == [("shape", "x", 10), ("shape", "y", 20)]
+
+
+# === WKB ===
+@pytest.mark.parametrize("multipart", [False, True])
+def test_wkb_round_trip(multipart):
+    template = profile_geometry.ProfileTemplate(100.0, 4, 2, 3, 4, 5, multipart=multipart)
+    for features, geometry_type in ((template.lines, "POLYLINE"), (template.polygons, "POLYGON")):
+        shapes = profile_writers.EncodeWKB(features, geometry_type)
+        assert len(shapes) == len(features)
+        for index, shape in enumerate(shapes):
+            parts = features.parts(index) if features.part_offsets is not None else [features.vertices(index)]
+            decoded = profile_writers.DecodeWKB(shape)
+            assert len(decoded) == len(parts)
+            for part, expected in zip(decoded, parts):
+                np.testing.assert_array_equal(part, expected)
+
+
+# === EditSession ===
+def test_edit_session_commits_every_save_and_on_exit():
+    backend = RecordingBackend()
+    backend.CreateFeatureClass("a", "POLYLINE", [], None)
+    metrics = profile_metrics.ProfileMetrics()
+    with metrics.Stage("write") as stage:
+        with profile_writers.EditSession(WORKSPACE, backend=backend, metrics=metrics) as session:
+            for value in range(3):
+                if value:
+                    session.Save()
+                with backend.InsertCursor("a", ["SHAPE@"]) as cursor:
+                    cursor.insertRow([value])
+    assert session.commits == backend.commits == stage.commits == 3
+    assert backend.rollbacks == stage.rollbacks == 0
+    assert backend.tables["a"] == [(0,), (1,), (2,)]
+
+
+def test_edit_session_rolls_back_unsaved_edits_on_error():
+    backend = RecordingBackend()
+    backend.CreateFeatureClass("a", "POLYLINE", [], None)
+    metrics = profile_metrics.ProfileMetrics()
+    with metrics.Stage("write") as stage:
+        with pytest.raises(RuntimeError):
+            with profile_writers.EditSession(WORKSPACE, backend=backend, metrics=metrics) as session:
+                with backend.InsertCursor("a", ["SHAPE@"]) as cursor:
+                    cursor.insertRow([0])
+                session.Save()
+                with backend.InsertCursor("a", ["SHAPE@"]) as cursor:
+                    cursor.insertRow([1])
+                raise RuntimeError("write failed")
+    # The saved operation stays, the one in progress is discarded
+    assert backend.tables["a"] == [(0,)]
+    assert (backend.commits, backend.rollbacks) == (1, 1)
+    assert (stage.commits, stage.rollbacks) == (1, 1)
+
+
+def test_edit_workspace():
+    assert profile_writers.EditWorkspace("C:/data/bores.gdb/lines") == "C:/data/bores.gdb"
+    assert profile_writers.EditWorkspace("C:/data/bores.gdb/profiles/lines") == "C:/data/bores.gdb"
+
+
+# === Edit batches in generate_profile ===
+@pytest.mark.parametrize("edit_batch_size, batches", [(1, 5), (2, 3), (5, 1), (10, 1)])
+def test_saves_per_edit_batch(parameters, edit_batch_size, batches):
+    backend = RecordingBackend()
+    result = profile_generator.generate_profile(parameters(backend, edit_batch_size=edit_batch_size))
+    # One committed operation per batch of profiles and output
+    assert backend.commits == batches * len(OUTPUTS)
+    assert backend.rollbacks == 0
+    totals = result.metrics.AsDict()
+    assert sum(stage["commits"] for stage in totals.values()) == backend.commits
+    assert result.rows == {output: len(backend.tables[path]) for output, path in OUTPUTS.items()}
+
+
+def test_without_edit_batch_size_no_session_is_opened(parameters):
+    backend = RecordingBackend()
+    profile_generator.generate_profile(parameters(backend))
+    assert backend.commits == backend.rollbacks == 0
+
+
+def test_failed_write_rolls_back_and_deletes_outputs(parameters):
+    # Fail in the third batch of depth polygons (three polygons per profile)
+    backend = RecordingBackend(fail_path=OUTPUTS["depth_polygons"], fail_after=4 * 3)
+    with pytest.raises(RuntimeError):
+        profile_generator.generate_profile(parameters(backend, edit_batch_size=2))
+    assert backend.rollbacks == 1
+    assert not any(backend.Exists(path) for path in OUTPUTS.values())
+
+
+# === Schema templates ===
+def FieldNames(path):
+    return [field.name for field in fake_arcpy.WORKSPACE[path].fields]
+
+
+def test_schema_templates_are_built_once_and_reused(arcpy, parameters):
+    for run in range(3):
+        profile_generator.generate_profile(parameters(profile_writers.ArcpyBackend(), spatial_reference=3857))
+        # One AddFields call per output schema on the first run only; no per-field AddField calls
+        assert fake_arcpy.COUNTS["AddFields"] == len(OUTPUTS)
+        assert fake_arcpy.COUNTS["AddField"] == 0
+        assert fake_arcpy.COUNTS["CreateFeatureclass"] == len(OUTPUTS) * (run + 2)
+
+    scratch = [path for path in fake_arcpy.WORKSPACE if path.startswith(arcpy.env.scratchGDB)]
+    assert len(scratch) == len(OUTPUTS)
+    for output, path in OUTPUTS.items():
+        geometry_type, schema = profile_generator.OUTPUT_SCHEMAS[output]
+        template = os.path.join(arcpy.env.scratchGDB, profile_writers.SchemaTemplateName(geometry_type, schema))
+        assert template in scratch
+        assert FieldNames(path) == FieldNames(template) == ["OBJECTID", "Shape"] + [name for name, _, _ in schema]
+
+
+def test_without_schema_templates_fields_are_added_to_each_output(arcpy, parameters):
+    for run in range(2):
+        profile_generator.generate_profile(parameters(profile_writers.ArcpyBackend(schema_templates=False),
+                                                      spatial_reference=3857))
+    assert fake_arcpy.COUNTS["AddFields"] == fake_arcpy.COUNTS["CreateFeatureclass"] == 2 * len(OUTPUTS)
+    assert not [path for path in fake_arcpy.WORKSPACE if path.startswith(arcpy.env.scratchGDB)]